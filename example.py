@@ -31,6 +31,37 @@ async def example():
     language = "zh_CN"  # 设置程序提示语言
     author_archive = True  # 是否将每个作者的作品存至单独的文件夹
     write_mtime = True  # 是否将作品文件的 修改时间 修改为作品的发布时间
+    deduplicate = False  # 是否启用文件去重存储，相同内容的文件仅保存一份
+    file_index = True  # 是否记录已下载文件索引，用于校验已下载文件与按分片方式移动文件
+    bandwidth_day = 0  # 白天下载带宽上限，单位：Mbit/s，0 代表不限速
+    bandwidth_night = 0  # 夜间下载带宽上限，单位：Mbit/s，0 代表不限速
+    memory_budget = 0  # 下载缓冲区与排队任务的内存预算，单位：MB，0 代表不限制
+    video_quality = "origin"  # 视频作品下载画质，支持：origin（原始文件）、best（最高画质）、smallest（最小文件）、分辨率上限（例如：720）
+    video_codec = ""  # 视频作品优先选择的编码，支持：h264、h265、av1，空字符串不限制
+    live_quality = "h264"  # 动图文件下载画质，支持：h264、h265、best（最高画质）、smallest（最小文件）
+    live_mode = ""  # 图文作品下载内容，支持：still（仅静态图片）、live（仅动图），空字符串代表均下载
+    cdn_hosts = {
+        "image": [],
+        "original": [],
+        "video": [],
+    }  # 各类型作品文件的 CDN 域名，下载时优先使用延迟最低的可用域名，空列表代表使用默认域名
+    cdn_hedge = 0  # CDN 首字节等待超过该时间时向备用域名发送请求，单位：秒，0 为不启用
+    page_hedge = 0  # 作品页面请求耗时超过近期耗时的 95 百分位时发送对冲请求，对冲请求占请求总数的百分比上限，0 代表不启用
+    hedge_proxy = None  # 发送对冲请求使用的网络代理，None 代表使用同一个网络连接池
+    request_pool = {
+        "max_connections": 100,
+        "max_keepalive_connections": 20,
+        "keepalive_expiry": 30,
+        "http2": False,
+    }  # 请求作品页面的连接池参数，keepalive_expiry 单位：秒，启用 http2 需要安装 h2 模块
+    download_pool = {
+        "max_connections": 100,
+        "max_keepalive_connections": 20,
+        "keepalive_expiry": 30,
+        "http2": False,
+    }  # 下载作品文件的连接池参数
+    warm_up = True  # 是否在启动时预热网络连接，后台预先建立与作品页面及 CDN 域名的连接
+    folder_shard = ""  # 下载文件夹分片方式，支持：author（作者 ID 哈希前缀）、month（发布年月），空字符串代表不分片
     read_cookie = None  # 读取浏览器 Cookie，支持设置浏览器名称（字符串）或者浏览器序号（整数），设置为 None 代表不读取
 
     # async with XHS() as xhs:
@@ -57,6 +88,23 @@ async def example():
         read_cookie=read_cookie,
         author_archive=author_archive,
         write_mtime=write_mtime,
+        deduplicate=deduplicate,
+        file_index=file_index,
+        bandwidth_day=bandwidth_day,
+        bandwidth_night=bandwidth_night,
+        folder_shard=folder_shard,
+        memory_budget=memory_budget,
+        video_quality=video_quality,
+        video_codec=video_codec,
+        live_quality=live_quality,
+        live_mode=live_mode,
+        cdn_hosts=cdn_hosts,
+        cdn_hedge=cdn_hedge,
+        page_hedge=page_hedge,
+        hedge_proxy=hedge_proxy,
+        request_pool=request_pool,
+        download_pool=download_pool,
+        warm_up=warm_up,
     ) as xhs:  # 使用自定义参数
         download = True  # 是否下载作品文件，默认值：False
         # 返回作品详细信息，包括下载地址
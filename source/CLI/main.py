@@ -13,6 +13,7 @@ from click import (
     echo,
 )
 from rich import print
+from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 
@@ -44,6 +45,12 @@ class CLI:
         self.index = self.__format_index(ctx.params.pop("index"))
         self.path = ctx.params.pop("settings")
         self.update = ctx.params.pop("update_settings")
+        self.audit = ctx.params.pop("audit")
+        self.repair = ctx.params.pop("repair")
+        self.clean = ctx.params.pop("clean")
+        self.reshard = ctx.params.pop("reshard")
+        self.rebuild_index = ctx.params.pop("rebuild_index")
+        self.dedup_report = ctx.params.pop("dedup_report")
         self.settings = Settings(self.__check_settings_path())
         self.parameter = self.settings.run() | self.__clean_params(ctx.params)
         self.APP = XHS(**self.parameter)
@@ -57,7 +64,26 @@ class CLI:
 
     async def run(self):
         if self.url:
-            await self.APP.extract_cli(self.url, index=self.index)
+            with Live(
+                get_renderable=self.APP.progress.render,
+                refresh_per_second=2,
+                transient=True,
+            ):
+                await self.APP.extract_cli(
+                    self.url,
+                    index=self.index,
+                    bar=self.APP.progress,
+                )
+        if self.rebuild_index:
+            await self.APP.rebuild_file_index()
+        if self.audit or self.repair:
+            await self.APP.audit(self.repair)
+        if self.reshard:
+            await self.APP.reshard()
+        if self.dedup_report:
+            await self.APP.dedup_report()
+        if self.clean:
+            await self.APP.clean_directories()
         self.__update_settings()
 
     def __update_settings(self):
@@ -179,6 +205,97 @@ class CLI:
                     width=55,
                 ),
             ),
+            ("--deduplicate", "-dd", "bool", _("是否启用文件去重存储")),
+            (
+                "--file_index",
+                "-fi",
+                "bool",
+                fill(_("是否记录已下载文件索引，用于校验与分片迁移"), width=55),
+            ),
+            ("--warm_up", "-wu", "bool", _("是否在启动时预热网络连接")),
+            (
+                "--bandwidth_day",
+                "-bd",
+                "float",
+                _("白天下载带宽上限，单位：Mbit/s"),
+            ),
+            (
+                "--bandwidth_night",
+                "-bn",
+                "float",
+                _("夜间下载带宽上限，单位：Mbit/s"),
+            ),
+            (
+                "--folder_shard",
+                "-fs",
+                "choice",
+                fill(
+                    _("下载文件夹分片方式，支持：author、month，留空代表不分片"),
+                    width=55,
+                ),
+            ),
+            (
+                "--memory_budget",
+                "-mb",
+                "float",
+                fill(_("下载缓冲区与排队任务的内存预算，单位：MB"), width=55),
+            ),
+            (
+                "--cdn_hedge",
+                "-ch",
+                "float",
+                fill(
+                    _("CDN 首字节等待时间超过该值时向备用域名发送请求，单位：秒"),
+                    width=55,
+                ),
+            ),
+            (
+                "--page_hedge",
+                "-ph",
+                "float",
+                fill(
+                    _("作品页面对冲请求占请求总数的百分比上限，0 代表不启用"),
+                    width=55,
+                ),
+            ),
+            ("--hedge_proxy", "-hp", "str", _("发送对冲请求使用的网络代理")),
+            (
+                "--video_quality",
+                "-vq",
+                "str",
+                fill(
+                    _(
+                        "视频作品下载画质，支持：origin、best、smallest、分辨率上限（例如：720）"
+                    ),
+                    width=55,
+                ),
+            ),
+            (
+                "--video_codec",
+                "-vc",
+                "choice",
+                fill(_("视频作品优先选择的编码，支持：h264、h265、av1"), width=55),
+            ),
+            (
+                "--live_quality",
+                "-lq",
+                "choice",
+                fill(
+                    _("动图文件下载画质，支持：h264、h265、best、smallest"),
+                    width=55,
+                ),
+            ),
+            (
+                "--live_mode",
+                "-lm",
+                "choice",
+                fill(
+                    _(
+                        "图文作品下载内容，支持：still（仅静态图片）、live（仅动图），留空代表均下载"
+                    ),
+                    width=55,
+                ),
+            ),
             ("--language", "-l", "choice", _("设置程序语言，目前支持：zh_CN、en_US")),
             ("--settings", "-s", "str", _("读取指定配置文件")),
             (
@@ -201,6 +318,37 @@ class CLI:
                 ),
             ),
             ("--update_settings", "-us", "flag", _("是否更新配置文件")),
+            ("--audit", "-au", "flag", _("校验已下载文件与下载记录是否一致")),
+            (
+                "--repair",
+                "-rp",
+                "flag",
+                fill(_("校验已下载文件，并仅重新下载缺失或损坏的文件"), width=55),
+            ),
+            (
+                "--rebuild_index",
+                "-ri",
+                "flag",
+                fill(_("扫描下载文件夹，重建已下载文件索引"), width=55),
+            ),
+            (
+                "--dedup_report",
+                "-ds",
+                "flag",
+                fill(_("统计去重存储的文件数量与节省的空间"), width=55),
+            ),
+            (
+                "--reshard",
+                "-rs",
+                "flag",
+                fill(_("按当前分片方式移动已下载的文件，需要作品数据记录"), width=55),
+            ),
+            (
+                "--clean",
+                "-cl",
+                "flag",
+                fill(_("遍历下载文件夹，删除全部空文件夹"), width=55),
+            ),
             ("--help", "-h", "flag", _("查看详细参数说明")),
             ("--version", "-v", "flag", _("查看 XHS-Downloader 版本")),
         )
@@ -302,6 +450,74 @@ class CLI:
     "-wm",
     type=bool,
 )
+@option(
+    "--deduplicate",
+    "-dd",
+    type=bool,
+)
+@option(
+    "--file_index",
+    "-fi",
+    type=bool,
+)
+@option(
+    "--warm_up",
+    "-wu",
+    type=bool,
+)
+@option(
+    "--bandwidth_day",
+    "-bd",
+    type=float,
+)
+@option(
+    "--bandwidth_night",
+    "-bn",
+    type=float,
+)
+@option(
+    "--folder_shard",
+    "-fs",
+    type=Choice(["", "author", "month"]),
+)
+@option(
+    "--memory_budget",
+    "-mb",
+    type=float,
+)
+@option(
+    "--cdn_hedge",
+    "-ch",
+    type=float,
+)
+@option(
+    "--page_hedge",
+    "-ph",
+    type=float,
+)
+@option(
+    "--hedge_proxy",
+    "-hp",
+)
+@option(
+    "--video_quality",
+    "-vq",
+)
+@option(
+    "--video_codec",
+    "-vc",
+    type=Choice(["", "h264", "h265", "av1"]),
+)
+@option(
+    "--live_quality",
+    "-lq",
+    type=Choice(["h264", "h265", "best", "smallest"]),
+)
+@option(
+    "--live_mode",
+    "-lm",
+    type=Choice(["", "still", "live"]),
+)
 @option(
     "--language",
     "-l",
@@ -327,6 +543,42 @@ class CLI:
     type=bool,
     is_flag=True,
 )
+@option(
+    "--audit",
+    "-au",
+    type=bool,
+    is_flag=True,
+)
+@option(
+    "--repair",
+    "-rp",
+    type=bool,
+    is_flag=True,
+)
+@option(
+    "--rebuild_index",
+    "-ri",
+    type=bool,
+    is_flag=True,
+)
+@option(
+    "--dedup_report",
+    "-ds",
+    type=bool,
+    is_flag=True,
+)
+@option(
+    "--reshard",
+    "-rs",
+    type=bool,
+    is_flag=True,
+)
+@option(
+    "--clean",
+    "-cl",
+    type=bool,
+    is_flag=True,
+)
 @option(
     "-h",
     "--help",
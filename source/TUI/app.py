@@ -86,8 +86,8 @@ class XHSDownloader(App):
 
     async def refresh_screen(self):
         await self.action_back()
-        await self.close_database()
         await self.APP.close()
+        await self.close_database()
         self.__initialization()
         await self.__aenter__()
         self.uninstall_screen("index")
@@ -136,3 +136,10 @@ class XHSDownloader(App):
         await self.APP.id_recorder.database.close()
         await self.APP.data_recorder.cursor.close()
         await self.APP.data_recorder.database.close()
+        await self.APP.file_recorder.flush()
+        await self.APP.file_recorder.cursor.close()
+        await self.APP.file_recorder.database.close()
+        await self.APP.blob_recorder.cursor.close()
+        await self.APP.blob_recorder.database.close()
+        await self.APP.journal_recorder.cursor.close()
+        await self.APP.journal_recorder.database.close()
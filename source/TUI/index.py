@@ -20,6 +20,7 @@ from ..module import (
 )
 from ..translation import _
 from .monitor import Monitor
+from .progress import Progress
 
 __all__ = ["Index"]
 
@@ -109,12 +110,14 @@ class Index(Screen):
 
     @work(exclusive=True)
     async def deal(self):
-        await self.app.push_screen("loading")
+        self.xhs.progress.reset()
+        await self.app.push_screen(Progress(self.xhs.progress))
         if any(
             await self.xhs.extract(
                 self.url.value,
                 True,
                 log=self.tip,
+                bar=self.xhs.progress,
                 data=False,
             )
         ):
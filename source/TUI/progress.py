@@ -1,9 +1,31 @@
 from textual.app import ComposeResult
-from textual.screen import Screen
+from textual.containers import Grid
+from textual.screen import ModalScreen
+from textual.widgets import Label, Static
+
+from ..expansion import TransferProgress
+from ..translation import _
 
 __all__ = ["Progress"]
 
 
-class Progress(Screen):
+class Progress(ModalScreen):
+    def __init__(
+        self,
+        progress: TransferProgress,
+    ):
+        super().__init__()
+        self.progress = progress
+
     def compose(self) -> ComposeResult:
-        pass
+        yield Grid(
+            Label(_("程序处理中...")),
+            Static(self.progress.render()),
+            id="progress",
+        )
+
+    def on_mount(self) -> None:
+        self.set_interval(self.progress.interval, self.refresh_progress)
+
+    def refresh_progress(self) -> None:
+        self.query_one(Static).update(self.progress.render())
@@ -114,6 +114,67 @@ class Setting(Screen):
                 type="integer",
                 id="max_retry",
             ),
+            Label(
+                _("白天 / 夜间下载带宽上限，单位：Mbit/s，0 代表不限速"),
+                classes="params",
+            ),
+            Container(
+                Input(
+                    str(self.data["bandwidth_day"]),
+                    placeholder="0",
+                    type="number",
+                    id="bandwidth_day",
+                ),
+                Input(
+                    str(self.data["bandwidth_night"]),
+                    placeholder="0",
+                    type="number",
+                    id="bandwidth_night",
+                ),
+                classes="horizontal-layout",
+            ),
+            Label(
+                _("下载缓冲区与排队任务的内存预算，单位：MB，0 代表不限制"),
+                classes="params",
+            ),
+            Input(
+                str(self.data["memory_budget"]),
+                placeholder="0",
+                type="number",
+                id="memory_budget",
+            ),
+            Label(
+                _(
+                    "CDN 首字节等待时间超过该值时向备用域名发送请求，单位：秒，0 代表不启用"
+                ),
+                classes="params",
+            ),
+            Input(
+                str(self.data["cdn_hedge"]),
+                placeholder="0",
+                type="number",
+                id="cdn_hedge",
+            ),
+            Label(
+                _("作品页面对冲请求占请求总数的百分比上限，0 代表不启用"),
+                classes="params",
+            ),
+            Input(
+                str(self.data["page_hedge"]),
+                placeholder="0",
+                type="number",
+                id="page_hedge",
+            ),
+            Label(
+                _("发送对冲请求使用的网络代理"),
+                classes="params",
+            ),
+            Input(
+                self.data["hedge_proxy"],
+                placeholder=_("不使用代理"),
+                valid_empty=True,
+                id="hedge_proxy",
+            ),
             Label(),
             Container(
                 Checkbox(
@@ -162,11 +223,34 @@ class Setting(Screen):
                 ),
                 classes="horizontal-layout",
             ),
+            Label(),
+            Container(
+                Checkbox(
+                    _("文件去重存储模式"),
+                    id="deduplicate",
+                    value=self.data["deduplicate"],
+                ),
+                Checkbox(
+                    _("记录已下载文件索引"),
+                    id="file_index",
+                    value=self.data["file_index"],
+                ),
+                Checkbox(
+                    _("启动时预热网络连接"),
+                    id="warm_up",
+                    value=self.data["warm_up"],
+                ),
+                classes="horizontal-layout",
+            ),
             Container(
                 Label(
                     _("图片下载格式"),
                     classes="params",
                 ),
+                Label(
+                    _("文件夹分片方式"),
+                    classes="params",
+                ),
                 Label(
                     _("程序语言"),
                     classes="params",
@@ -181,6 +265,16 @@ class Setting(Screen):
                     allow_blank=False,
                     id="image_format",
                 ),
+                Select(
+                    (
+                        (_("不分片"), ""),
+                        (_("作者 ID"), "author"),
+                        (_("发布年月"), "month"),
+                    ),
+                    value=self.data["folder_shard"],
+                    allow_blank=False,
+                    id="folder_shard",
+                ),
                 Select.from_values(
                     ["zh_CN", "en_US"],
                     value=self.data["language"],
@@ -189,6 +283,67 @@ class Setting(Screen):
                 ),
                 classes="horizontal-layout",
             ),
+            Container(
+                Label(
+                    _("视频下载画质"),
+                    classes="params",
+                ),
+                Label(
+                    _("视频优先编码"),
+                    classes="params",
+                ),
+                Label(
+                    _("动图下载画质"),
+                    classes="params",
+                ),
+                Label(
+                    _("图文作品下载内容"),
+                    classes="params",
+                ),
+                classes="horizontal-layout",
+            ),
+            Label(),
+            Container(
+                Select(
+                    self.__video_quality_options(),
+                    value=self.data["video_quality"],
+                    allow_blank=False,
+                    id="video_quality",
+                ),
+                Select(
+                    (
+                        (_("不限"), ""),
+                        ("H.264", "h264"),
+                        ("H.265", "h265"),
+                        ("AV1", "av1"),
+                    ),
+                    value=self.data["video_codec"],
+                    allow_blank=False,
+                    id="video_codec",
+                ),
+                Select(
+                    (
+                        ("H.264", "h264"),
+                        ("H.265", "h265"),
+                        (_("最高画质"), "best"),
+                        (_("最小文件"), "smallest"),
+                    ),
+                    value=self.data["live_quality"],
+                    allow_blank=False,
+                    id="live_quality",
+                ),
+                Select(
+                    (
+                        (_("图片与动图"), ""),
+                        (_("仅静态图片"), "still"),
+                        (_("仅动图"), "live"),
+                    ),
+                    value=self.data["live_mode"],
+                    allow_blank=False,
+                    id="live_mode",
+                ),
+                classes="horizontal-layout",
+            ),
             Container(
                 Button(
                     _("保存配置"),
@@ -208,13 +363,28 @@ class Setting(Screen):
             return _("小红书网页版 Cookie，无需登录，参数已设置")
         return _("小红书网页版 Cookie，无需登录，参数未设置")
 
+    def __video_quality_options(self) -> list[tuple[str, str]]:
+        options = [
+            (_("原始文件"), "origin"),
+            (_("最高画质"), "best"),
+            (_("最小文件"), "smallest"),
+            ("1080P", "1080"),
+            ("720P", "720"),
+            ("480P", "480"),
+        ]
+        # 配置文件中设置的其他分辨率上限
+        if (value := self.data["video_quality"]) not in {i for _, i in options}:
+            options.append((f"{value}P", value))
+        return options
+
     def on_mount(self) -> None:
         self.title = _("程序设置")
 
     @on(Button.Pressed, "#save")
     def save_settings(self):
         self.dismiss(
-            {
+            self.data
+            | {
                 "mapping_data": self.data.get("mapping_data", {}),
                 "work_path": self.query_one("#work_path").value,
                 "folder_name": self.query_one("#folder_name").value,
@@ -225,9 +395,20 @@ class Setting(Screen):
                 "timeout": int(self.query_one("#timeout").value),
                 "chunk": int(self.query_one("#chunk").value),
                 "max_retry": int(self.query_one("#max_retry").value),
+                "bandwidth_day": float(self.query_one("#bandwidth_day").value or 0),
+                "bandwidth_night": float(self.query_one("#bandwidth_night").value or 0),
+                "memory_budget": float(self.query_one("#memory_budget").value or 0),
+                "cdn_hedge": float(self.query_one("#cdn_hedge").value or 0),
+                "page_hedge": float(self.query_one("#page_hedge").value or 0),
+                "hedge_proxy": self.query_one("#hedge_proxy").value,
                 "record_data": self.query_one("#record_data").value,
                 "image_format": self.query_one("#image_format").value,
                 "folder_mode": self.query_one("#folder_mode").value,
+                "folder_shard": self.query_one("#folder_shard").value,
+                "video_quality": self.query_one("#video_quality").value,
+                "video_codec": self.query_one("#video_codec").value,
+                "live_quality": self.query_one("#live_quality").value,
+                "live_mode": self.query_one("#live_mode").value,
                 "language": self.query_one("#language").value,
                 "image_download": self.query_one("#image_download").value,
                 "video_download": self.query_one("#video_download").value,
@@ -235,6 +416,9 @@ class Setting(Screen):
                 "download_record": self.query_one("#download_record").value,
                 "author_archive": self.query_one("#author_archive").value,
                 "write_mtime": self.query_one("#write_mtime").value,
+                "deduplicate": self.query_one("#deduplicate").value,
+                "file_index": self.query_one("#file_index").value,
+                "warm_up": self.query_one("#warm_up").value,
             }
         )
 
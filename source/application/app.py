@@ -1,8 +1,18 @@
-from asyncio import Event, Queue, QueueEmpty, create_task, gather, sleep
+from asyncio import (
+    CancelledError,
+    Event,
+    Queue,
+    QueueEmpty,
+    Task,
+    create_task,
+    gather,
+    sleep,
+)
 from contextlib import suppress
 from datetime import datetime
 from re import compile
 from urllib.parse import urlparse
+from uuid import uuid4
 
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
@@ -16,6 +26,8 @@ from source.expansion import (
     Cleaner,
     Converter,
     Namespace,
+    Priority,
+    TransferProgress,
     beautify_string,
 )
 from source.module import (
@@ -30,20 +42,28 @@ from source.module import (
     WARNING,
     DataRecorder,
     ExtractData,
+    BlobRecorder,
+    BandwidthParams,
     ExtractParams,
+    FileRecorder,
     IDRecorder,
+    JournalRecorder,
     Manager,
     MapRecorder,
+    SearchData,
+    SearchParams,
     logging,
     sleep_time,
 )
 from source.translation import _, switch_language
 
 from ..module import Mapping
+from .audit import Audit
 from .download import Download
 from .explore import Explore
 from .image import Image
 from .request import Html
+from .reshard import Reshard
 from .video import Video
 
 __all__ = ["XHS"]
@@ -104,6 +124,23 @@ class XHS:
         download_record=True,
         author_archive=False,
         write_mtime=False,
+        deduplicate=False,
+        file_index=True,
+        bandwidth_day: float = 0,
+        bandwidth_night: float = 0,
+        folder_shard="",
+        memory_budget: float = 0,
+        video_quality: str | int = "origin",
+        video_codec="",
+        live_quality="h264",
+        live_mode="",
+        cdn_hosts: dict[str, list[str]] = None,
+        cdn_hedge: float = 0,
+        page_hedge: float = 0,
+        hedge_proxy: str = None,
+        request_pool: dict = None,
+        download_pool: dict = None,
+        warm_up=True,
         language="zh_CN",
         read_cookie: int | str = None,
         _print: bool = True,
@@ -131,6 +168,23 @@ class XHS:
             folder_mode,
             author_archive,
             write_mtime,
+            deduplicate,
+            file_index,
+            bandwidth_day,
+            bandwidth_night,
+            folder_shard,
+            memory_budget,
+            video_quality,
+            video_codec,
+            live_quality,
+            live_mode,
+            cdn_hosts,
+            cdn_hedge,
+            page_hedge,
+            hedge_proxy,
+            request_pool,
+            download_pool,
+            warm_up,
             _print,
         )
         self.mapping_data = mapping_data or {}
@@ -143,23 +197,58 @@ class XHS:
         self.video = Video()
         self.explore = Explore()
         self.convert = Converter()
-        self.download = Download(self.manager)
+        self.file_recorder = FileRecorder(self.manager)
+        self.blob_recorder = BlobRecorder(self.manager)
+        self.journal_recorder = JournalRecorder(self.manager)
+        self.download = Download(
+            self.manager,
+            self.file_recorder,
+            self.blob_recorder,
+            self.journal_recorder,
+        )
+        self.progress = TransferProgress()
+        # 服务器模式下每个请求使用独立的进度记录，请求完成后移除
+        self.transfers: dict[str, TransferProgress] = {}
         self.id_recorder = IDRecorder(self.manager)
         self.data_recorder = DataRecorder(self.manager)
+        self.auditor = Audit(
+            self.manager,
+            self.id_recorder,
+            self.file_recorder,
+            self.journal_recorder,
+        )
+        self.resharder = Reshard(
+            self.manager,
+            self.file_recorder,
+            self.data_recorder,
+            self.__naming_rules,
+        )
         self.clipboard_cache: str = ""
         self.queue = Queue()
         self.event = Event()
+        self.warming: Task | None = None
+        self.resuming: Task | None = None
         # self.runner = self.init_server()
         # self.site = None
         self.server = None
 
     def __extract_image(self, container: dict, data: Namespace):
-        container["下载地址"], container["动图地址"] = self.image.get_image_link(
-            data, self.manager.image_format
+        (
+            container["下载地址"],
+            container["动图地址"],
+            container["动图备用地址"],
+        ) = self.image.get_image_link(
+            data,
+            self.manager.image_format,
+            self.manager.live_quality,
         )
 
     def __extract_video(self, container: dict, data: Namespace):
-        container["下载地址"] = self.video.get_video_link(data)
+        container["下载地址"], container["视频流"] = self.video.get_video_link(
+            data,
+            self.manager.video_quality,
+            self.manager.video_codec,
+        )
         container["动图地址"] = [
             None,
         ]
@@ -171,12 +260,14 @@ class XHS:
         index,
         log,
         bar,
+        priority: Priority = Priority.NORMAL,
     ):
         name = self.__naming_rules(container)
         if (u := container["下载地址"]) and download:
             if await self.skip_download(i := container["作品ID"]):
                 logging(log, _("作品 {0} 存在下载记录，跳过下载").format(i))
             else:
+                await self.mapping.wait(container["作者ID"])
                 path, result = await self.download.run(
                     u,
                     container["动图地址"],
@@ -189,12 +280,36 @@ class XHS:
                     container["时间戳"],
                     log,
                     bar,
+                    i,
+                    priority,
+                    container["作者ID"],
+                    self.__get_mirrors(container),
                 )
-                await self.__add_record(i, result)
+                # 仅下载静态图片或动图时，作品文件并不完整，不写入下载记录
+                if not self.manager.live_mode or container["作品类型"] == _("视频"):
+                    await self.__add_record(i, result)
         elif not u:
             logging(log, _("提取作品文件下载地址失败"), ERROR)
         await self.save_data(container)
 
+    @staticmethod
+    def __get_mirrors(container: dict) -> dict[str, list[str]]:
+        mirrors = {
+            i: j
+            for i, j in zip(
+                container["动图地址"],
+                container.get("动图备用地址", []),
+            )
+            if i and j
+        }
+        # 视频作品使用已选择视频流的备用地址，原始文件没有备用地址
+        mirrors |= {
+            i["地址"]: i["备用地址"]
+            for i in container.get("视频流", [])
+            if i["已选择"] and i["备用地址"]
+        }
+        return mirrors
+
     @data_cache
     async def save_data(
         self,
@@ -218,6 +333,7 @@ class XHS:
         log=None,
         bar=None,
         data=True,
+        priority: Priority = Priority.NORMAL,
     ) -> list[dict]:
         # return  # 调试代码
         urls = await self.extract_links(url, log)
@@ -234,6 +350,7 @@ class XHS:
                 log,
                 bar,
                 data,
+                priority=priority,
             )
             for i in urls
         ]
@@ -292,6 +409,7 @@ class XHS:
         data: bool,
         cookie: str = None,
         proxy: str = None,
+        priority: Priority = Priority.NORMAL,
     ):
         if await self.skip_download(i := self.__extract_link_id(url)) and not data:
             msg = _("作品 {0} 存在下载记录，跳过处理").format(i)
@@ -303,6 +421,7 @@ class XHS:
             log=log,
             cookie=cookie,
             proxy=proxy,
+            state=True,
         )
         namespace = self.__generate_data_object(html)
         if not namespace:
@@ -325,7 +444,9 @@ class XHS:
             data["下载地址"] = []
             data["动图地址"] = []
         await self.update_author_nickname(data, log)
-        await self.__download_files(data, download, index, log, bar)
+        await self.__download_files(data, download, index, log, bar, priority)
+        # 记录包含 xsec_token 参数的原始链接，校验修复时使用该链接重新提取作品数据
+        await self.data_recorder.add_link(data["作品ID"], url)
         logging(log, _("作品处理完成：{0}").format(i))
         await sleep_time()
         return data
@@ -441,6 +562,85 @@ class XHS:
     def stop_monitor(self):
         self.event.set()
 
+    async def search(
+        self,
+        keyword: str,
+        page: int = 1,
+        size: int = 20,
+    ) -> tuple[int, list[dict]]:
+        return await self.data_recorder.search(keyword, page, size)
+
+    async def audit(self, repair=False, log=None) -> dict:
+        plan = await self.auditor.run(log)
+        if repair and (ids := await self.auditor.repair(plan, log)):
+            self.download.listing.clear()
+            for i in ids:
+                url, index = await self.__repair_target(i, plan["numbers"].get(i))
+                await self.__deal_extract(
+                    url,
+                    True,
+                    index,
+                    log,
+                    None,
+                    False,
+                    priority=Priority.BACKGROUND,
+                )
+        return plan
+
+    async def __repair_target(
+        self,
+        id_: str,
+        numbers: list | None,
+    ) -> tuple[str, list | None]:
+        """读取作品数据记录中的作品链接与文件列表，仅重新下载缺失或损坏的图片"""
+        if not (record := await self.data_recorder.select(id_)):
+            return f"https://www.xiaohongshu.com/explore/{id_}", None
+        url = (
+            await self.data_recorder.select_link(id_)
+            or record["作品链接"]
+            or f"https://www.xiaohongshu.com/explore/{id_}"
+        )
+        # 视频作品的文件没有序号，需要重新下载全部文件
+        if not numbers or None in numbers:
+            return url, None
+        total = len((record["下载地址"] or "").split())
+        return url, sorted(i for i in set(numbers) if 0 < i <= total) or None
+
+    async def dedup_report(self, log=None) -> dict:
+        report = await self.blob_recorder.report()
+        if report:
+            logging(
+                log,
+                _(
+                    "去重存储共 {blobs} 个文件，{links} 个链接，"
+                    "占用 {size} 字节，节省 {saved} 字节"
+                ).format(**report),
+            )
+        else:
+            logging(log, _("文件去重存储功能未开启，无法统计去重数据"), WARNING)
+        return report
+
+    def set_bandwidth(self, day: float = None, night: float = None) -> dict:
+        self.manager.limiter.set_limit(day, night)
+        return self.manager.limiter.status()
+
+    async def clean_directories(self, log=None):
+        await self.manager.remove_empty_directories()
+        logging(log, _("已删除下载文件夹中的空文件夹"))
+
+    async def reshard(self, log=None) -> int:
+        self.download.listing.clear()
+        return await self.resharder.run(log)
+
+    async def rebuild_file_index(self, log=None) -> int:
+        if not self.manager.file_index:
+            logging(log, _("文件索引功能未开启，无法重建文件索引"), WARNING)
+            return 0
+        self.download.listing.clear()
+        count = await self.file_recorder.rebuild()
+        logging(log, _("文件索引重建完成，共 {0} 个文件").format(count))
+        return count
+
     async def skip_download(self, id_: str) -> bool:
         return bool(await self.id_recorder.select(id_))
 
@@ -448,15 +648,34 @@ class XHS:
         await self.id_recorder.__aenter__()
         await self.data_recorder.__aenter__()
         await self.map_recorder.__aenter__()
+        await self.file_recorder.__aenter__()
+        await self.blob_recorder.__aenter__()
+        await self.journal_recorder.__aenter__()
+        self.mapping.recover()
+        if self.manager.warm_up:
+            # 预热连接在后台执行，不延迟首个请求
+            self.warming = create_task(self.manager.preconnect())
+        # 清理缓存文件后才能开始新的下载任务；上次运行中断的文件在后台继续下载，退出时记录下载进度
+        self.resuming = create_task(self.download.resume(await self.download.prepare()))
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
+        # 先停止后台任务，取消下载时需要写入下载日志
+        await self.close()
         await self.id_recorder.__aexit__(exc_type, exc_value, traceback)
         await self.data_recorder.__aexit__(exc_type, exc_value, traceback)
         await self.map_recorder.__aexit__(exc_type, exc_value, traceback)
-        await self.close()
+        await self.file_recorder.__aexit__(exc_type, exc_value, traceback)
+        await self.blob_recorder.__aexit__(exc_type, exc_value, traceback)
+        await self.journal_recorder.__aexit__(exc_type, exc_value, traceback)
 
     async def close(self):
+        for task in (self.warming, self.resuming):
+            if task and not task.done():
+                task.cancel()
+                with suppress(CancelledError):
+                    await task
+        await self.mapping.close()
         await self.manager.close()
 
     @staticmethod
@@ -555,18 +774,78 @@ class XHS:
                 msg = _("提取小红书作品链接失败")
                 data = None
             else:
-                if data := await self.__deal_extract(
-                    url[0],
-                    extract.download,
-                    extract.index,
-                    None,
-                    None,
-                    not extract.skip,
-                    extract.cookie,
-                    extract.proxy,
-                ):
+                extract.request_id = extract.request_id or uuid4().hex
+                bar = self.transfers[extract.request_id] = TransferProgress()
+                try:
+                    data = await self.__deal_extract(
+                        url[0],
+                        extract.download,
+                        extract.index,
+                        None,
+                        bar,
+                        not extract.skip,
+                        extract.cookie,
+                        extract.proxy,
+                        extract.priority,
+                    )
+                finally:
+                    if self.transfers.get(extract.request_id) is bar:
+                        self.transfers.pop(extract.request_id)
+                if data:
                     msg = _("获取小红书作品数据成功")
                 else:
                     msg = _("获取小红书作品数据失败")
                     data = None
             return ExtractData(message=msg, params=extract, data=data)
+
+        @self.server.post(
+            "/xhs/search",
+            response_model=SearchData,
+        )
+        async def search(params: SearchParams):
+            if not self.manager.record_data:
+                msg = _("作品数据记录功能未开启，无法搜索作品")
+                total, data = 0, []
+            else:
+                params.page, params.size = DataRecorder.paginate(
+                    params.page,
+                    params.size,
+                )
+                total, data = await self.search(
+                    params.keyword,
+                    params.page,
+                    params.size,
+                )
+                msg = _("搜索作品数据成功")
+            return SearchData(message=msg, params=params, total=total, data=data)
+
+        @self.server.get("/xhs/progress")
+        async def progress(request_id: str = None):
+            return {
+                "requests": {
+                    k: v.snapshot()
+                    for k, v in self.transfers.items()
+                    if not request_id or k == request_id
+                },
+                "scheduler": self.download.SCHEDULER.status(),
+                "filesystem": self.manager.filesystem.status(),
+                "memory": self.manager.budget.status(),
+                "cdn": self.manager.hosts.status(),
+                "hedge": self.manager.hedge.status(),
+            }
+
+        @self.server.get("/xhs/dedup")
+        async def dedup():
+            return await self.dedup_report()
+
+        @self.server.post("/xhs/index")
+        async def rebuild_index():
+            return {"files": await self.rebuild_file_index()}
+
+        @self.server.get("/xhs/bandwidth")
+        async def bandwidth():
+            return self.manager.limiter.status()
+
+        @self.server.post("/xhs/bandwidth")
+        async def set_bandwidth(params: BandwidthParams):
+            return self.set_bandwidth(params.day, params.night)
@@ -0,0 +1,143 @@
+from asyncio import to_thread
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..module import (
+    ERROR,
+    FILE_SIGNATURES_LENGTH,
+    INFO,
+    WARNING,
+    logging,
+    match_signature,
+)
+from ..translation import _
+
+if TYPE_CHECKING:
+    from ..module import FileRecorder, IDRecorder, JournalRecorder, Manager
+
+__all__ = ["Audit"]
+
+
+class Audit:
+    MAX_WORKERS = 8
+    # 文件签名与扩展名不完全一致时视为同一类格式
+    COMPATIBLE = {
+        "jpg": "jpeg",
+        "m4v": "mp4",
+    }
+
+    def __init__(
+        self,
+        manager: "Manager",
+        id_recorder: "IDRecorder",
+        file_recorder: "FileRecorder",
+        journal_recorder: "JournalRecorder" = None,
+    ):
+        self.temp = manager.temp
+        self.id_recorder = id_recorder
+        self.file_recorder = file_recorder
+        self.journal_recorder = journal_recorder
+
+    async def run(self, log=None) -> dict:
+        ids = set(await self.id_recorder.all() or ())
+        files = await self.file_recorder.all()
+        result = await to_thread(self.__check_files, files)
+        plan = {
+            "missing": [],
+            "corrupt": [],
+            "orphan": await to_thread(self.__scan_temp, await self.__journaled()),
+            "unverified": sorted(ids - {i[1] for i in files}),
+            "redownload": [],
+            # 需要重新下载的作品中缺失或损坏的文件序号
+            "numbers": {},
+        }
+        for (path, id_, number, *__), state in zip(files, result):
+            if state:
+                plan[state].append(path)
+                if id_:
+                    plan["numbers"].setdefault(id_, []).append(number)
+        plan["redownload"] = sorted(plan["numbers"])
+        self.__print_plan(plan, len(files), log)
+        return plan
+
+    def __check_files(self, files: list[tuple]) -> list[str]:
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            return list(executor.map(self.__check_file, files))
+
+    @classmethod
+    def __check_file(cls, row: tuple) -> str:
+        path, size, format_ = row[0], row[3], row[4]
+        try:
+            with open(path, "rb") as f:
+                actual = f.seek(0, 2)
+                f.seek(0)
+                start = f.read(FILE_SIGNATURES_LENGTH)
+        except FileNotFoundError:
+            return "missing"
+        except OSError:
+            return "corrupt"
+        if not actual or (size and actual != size):
+            return "corrupt"
+        if (suffix := match_signature(start)) and cls.COMPATIBLE.get(
+            suffix, suffix
+        ) != cls.COMPATIBLE.get(format_, format_):
+            return "corrupt"
+        return ""
+
+    async def __journaled(self) -> set[str]:
+        if not self.journal_recorder:
+            return set()
+        return {i["TEMP"] for i in await self.journal_recorder.all()}
+
+    def __scan_temp(self, journaled: set[str]) -> list[str]:
+        # 存在下载日志的缓存文件可以继续下载，不属于残留文件
+        if not self.temp.is_dir():
+            return []
+        return [
+            str(i)
+            for i in self.temp.iterdir()
+            if i.is_file() and str(i) not in journaled
+        ]
+
+    @staticmethod
+    def __print_plan(plan: dict[str, list], total: int, log):
+        logging(
+            log,
+            _(
+                "文件校验完成，共 {0} 个文件，缺失 {1} 个，损坏 {2} 个，"
+                "残留缓存 {3} 个，无法校验的作品 {4} 个"
+            ).format(
+                total,
+                len(plan["missing"]),
+                len(plan["corrupt"]),
+                len(plan["orphan"]),
+                len(plan["unverified"]),
+            ),
+            WARNING if plan["redownload"] or plan["orphan"] else INFO,
+        )
+        for path in plan["missing"]:
+            logging(log, _("文件 {0} 缺失").format(path), ERROR)
+        for path in plan["corrupt"]:
+            logging(log, _("文件 {0} 损坏").format(path), ERROR)
+
+    async def repair(self, plan: dict, log=None) -> list[str]:
+        """删除损坏文件与残留缓存，清除对应作品的下载记录，返回需要重新下载的作品 ID"""
+        await to_thread(self.__delete_files, plan["corrupt"] + plan["orphan"])
+        await self.file_recorder.delete(
+            [Path(i) for i in plan["missing"] + plan["corrupt"]]
+        )
+        await self.id_recorder.delete(plan["redownload"])
+        logging(
+            log,
+            _("已清理 {0} 个损坏文件，{1} 个作品等待重新下载").format(
+                len(plan["corrupt"]) + len(plan["orphan"]),
+                len(plan["redownload"]),
+            ),
+        )
+        return plan["redownload"]
+
+    @staticmethod
+    def __delete_files(paths: list[str]):
+        for path in paths:
+            Path(path).unlink(missing_ok=True)
@@ -1,19 +1,24 @@
-from asyncio import Semaphore, gather
+from asyncio import Future, create_task, gather, get_running_loop, shield
+from base64 import b64decode
+from binascii import Error as DecodeError
+from contextlib import suppress
+from datetime import datetime
+from hashlib import md5, sha1, sha256
+from os import scandir
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from aiofiles import open
-from httpx import HTTPError
+from httpx import HTTPError, HTTPStatusError
 
-from ..expansion import CacheError
+from ..expansion import CacheError, IntegrityError, Priority, Scheduler
 
 # from ..module import WARNING
 from ..module import (
     ERROR,
-    FILE_SIGNATURES,
     FILE_SIGNATURES_LENGTH,
     MAX_WORKERS,
     logging,
+    match_signature,
     sleep_time,
 )
 from ..module import retry as re_download
@@ -22,13 +27,31 @@ from ..translation import _
 if TYPE_CHECKING:
     from httpx import AsyncClient
 
-    from ..module import Manager
+    from ..expansion import TransferProgress
+    from ..module import BlobRecorder, FileRecorder, JournalRecorder, Manager
 
 __all__ = ["Download"]
 
 
 class Download:
-    SEMAPHORE = Semaphore(MAX_WORKERS)
+    SCHEDULER = Scheduler(MAX_WORKERS)
+    # 无法获取文件大小时，按文件格式估算，用于同一优先级内的任务排序
+    ESTIMATE_SIZE = {
+        "mp4": 1024 * 1024 * 32,
+        "mov": 1024 * 1024 * 32,
+    }
+    DEFAULT_SIZE = 1024 * 1024
+    VIDEO_SUFFIX = {
+        "mp4",
+        "m4v",
+        "mov",
+        "mkv",
+        "mpg",
+        "flv",
+        "avi",
+    }
+    # 每个下载任务除写入缓冲区外的内存占用估算值，包含网络库的读取缓冲区
+    TASK_MEMORY = 256 * 1024
     CONTENT_TYPE_MAP = {
         "image/png": "png",
         "image/jpeg": "jpeg",
@@ -42,12 +65,25 @@ class Download:
     def __init__(
         self,
         manager: "Manager",
+        recorder: "FileRecorder" = None,
+        blobs: "BlobRecorder" = None,
+        journal: "JournalRecorder" = None,
     ):
         self.manager = manager
+        self.recorder = recorder if recorder and recorder.switch else None
+        self.blobs = blobs if blobs and blobs.switch else None
+        self.journal = journal
+        # 正在下载的链接，缓存文件由链接生成，相同链接的任务依次执行，避免同时写入同一个缓存文件
+        self.active: dict[str, Future] = {}
+        self.listing: dict[Path, set[str]] = {}
         self.folder = manager.folder
         self.temp = manager.temp
         self.chunk = manager.chunk
+        self.limiter = manager.limiter
+        self.budget = manager.budget
+        self.fs = manager.filesystem
         self.client: "AsyncClient" = manager.download_client
+        self.hosts = manager.hosts
         self.headers = manager.blank_headers
         self.retry = manager.retry
         self.folder_mode = manager.folder_mode
@@ -64,6 +100,7 @@ class Download:
         self.image_download = manager.image_download
         self.video_download = manager.video_download
         self.live_download = manager.live_download
+        self.live_mode = manager.live_mode
         self.author_archive = manager.author_archive
         self.write_mtime = manager.write_mtime
 
@@ -78,8 +115,13 @@ class Download:
         mtime: int,
         log,
         bar,
+        id_: str = None,
+        priority: Priority = Priority.NORMAL,
+        author: str = None,
+        mirrors: dict[str, list[str]] = None,
     ) -> tuple[Path, list[Any]]:
-        path = self.__generate_path(nickname, filename)
+        path = await self.__generate_path(nickname, filename, author, mtime)
+        await self.__load_listing(path, filename, len(urls))
         if type_ == _("视频"):
             tasks = self.__ready_download_video(
                 urls,
@@ -101,29 +143,47 @@ class Download:
             )
         else:
             raise ValueError
+        mirrors = mirrors or {}
         tasks = [
-            self.__download(
-                url,
+            self.__failover(
+                [url, *mirrors.get(url, ())],
                 path,
                 name,
                 format_,
                 mtime,
                 log,
                 bar,
+                id_,
+                number,
+                priority,
             )
-            for url, name, format_ in tasks
+            for url, name, format_, number in tasks
         ]
-        tasks = await gather(*tasks)
+        tasks = await self.__gather(tasks)
+        if self.recorder:
+            # 文件索引按作品批量提交
+            await self.recorder.flush()
         return path, tasks
 
-    def __generate_path(self, nickname: str, filename: str):
+    async def __generate_path(
+        self,
+        nickname: str,
+        filename: str,
+        author: str = None,
+        mtime: int = None,
+    ):
+        folder = self.folder
+        if shard := self.manager.shard(
+            author,
+            datetime.fromtimestamp(mtime) if mtime else None,
+        ):
+            folder = folder.joinpath(shard)
+            await self.fs.mkdir(folder)
         if self.author_archive:
-            folder = self.folder.joinpath(nickname)
-            folder.mkdir(exist_ok=True)
-        else:
-            folder = self.folder
+            folder = folder.joinpath(nickname)
+            await self.fs.mkdir(folder)
         path = self.manager.archive(folder, filename, self.folder_mode)
-        path.mkdir(exist_ok=True)
+        await self.fs.mkdir(path)
         return path
 
     def __ready_download_video(
@@ -134,7 +194,15 @@ class Download:
             return []
         if self.__check_exists_path(path, f"{name}.{self.video_format}", log):
             return []
-        return [(urls[0], name, self.video_format)]
+        return [(urls[0], name, self.video_format, None)]
+
+    async def __failover(self, urls: list[str], *args):
+        """主地址多次尝试失败后，依次使用备用地址下载"""
+        result = None
+        for url in dict.fromkeys(urls):
+            if result := await self.__download(url, *args):
+                break
+        return result
 
     def __ready_download_image(
         self,
@@ -145,15 +213,15 @@ class Download:
         name: str,
         log,
     ) -> list:
-        tasks = []
+        images, clips = [], []
         if not self.image_download:
             logging(log, _("图文作品下载功能已关闭，跳过下载"))
-            return tasks
+            return images
         for i, j in enumerate(zip(urls, lives), start=1):
             if index and i not in index:
                 continue
             file = f"{name}_{i}"
-            if not any(
+            if self.live_mode != "live" and not any(
                 self.__check_exists_path(
                     path,
                     f"{file}.{s}",
@@ -161,9 +229,9 @@ class Download:
                 )
                 for s in self.image_format_list
             ):
-                tasks.append([j[0], file, self.image_format])
+                images.append([j[0], file, self.image_format, i])
             if (
-                not self.live_download
+                not self.__live_enabled()
                 or not j[1]
                 or self.__check_exists_path(
                     path,
@@ -172,8 +240,17 @@ class Download:
                 )
             ):
                 continue
-            tasks.append([j[1], file, self.live_format])
-        return tasks
+            clips.append([j[1], file, self.live_format, i])
+        # 静态图片排在动图之前，体积较大的动图不会延后静态图片的完成时间
+        return images + clips
+
+    def __live_enabled(self) -> bool:
+        match self.live_mode:
+            case "live":
+                return True
+            case "still":
+                return False
+        return self.live_download
 
     def __check_exists_glob(
         self,
@@ -192,13 +269,74 @@ class Download:
         name: str,
         log,
     ) -> bool:
-        if path.joinpath(name).exists():
-            logging(log, _("{0} 文件已存在，跳过下载").format(name))
-            return True
-        return False
+        if name not in self.__get_listing(path):
+            return False
+        logging(log, _("{0} 文件已存在，跳过下载").format(name))
+        return True
+
+    def __get_listing(self, path: Path) -> set[str]:
+        # 每个文件夹仅扫描一次，之后仅需确认集合中已存在的文件
+        if (listing := self.listing.get(path)) is None:
+            listing = self.listing[path] = self.__scan_listing(path)
+        return listing
+
+    async def __load_listing(self, path: Path, name: str, count: int):
+        if (listing := self.listing.get(path)) is None:
+            self.listing[path] = await self.fs.run(self.__scan_listing, path)
+        elif names := listing & self.__expected_names(name, count):
+            # 缓存命中时确认文件仍然存在，程序运行期间被删除的文件需要重新下载；每个作品仅检查一次
+            listing.difference_update(
+                await self.fs.run(self.__find_missing, path, names)
+            )
+
+    def __expected_names(self, name: str, count: int) -> set[str]:
+        formats = (*self.image_format_list, self.live_format)
+        return {f"{name}.{self.video_format}"} | {
+            f"{name}_{i}.{j}" for i in range(1, count + 1) for j in formats
+        }
+
+    @staticmethod
+    def __scan_listing(path: Path) -> set[str]:
+        with scandir(path) as items:
+            return {i.name for i in items if not i.is_dir()}
+
+    @staticmethod
+    def __find_missing(path: Path, names: set[str]) -> set[str]:
+        return {i for i in names if not path.joinpath(i).exists()}
+
+    async def __record_file(
+        self,
+        file: Path,
+        id_: str,
+        number: int | None,
+        size: int,
+    ):
+        self.__get_listing(file.parent).add(file.name)
+        if self.recorder:
+            await self.recorder.add(
+                file,
+                id_,
+                number,
+                size,
+            )
+
+    async def __download(self, url: str, *args, resume: bool = False) -> bool:
+        if resume:
+            # 继续下载的任务在启动时已登记
+            future = self.active[url]
+        else:
+            while future := self.active.get(url):
+                await shield(future)
+            future = self.active[url] = get_running_loop().create_future()
+        result = False
+        try:
+            result = await self.__transfer(url, *args)
+            return result
+        finally:
+            self.__release(url, future, result)
 
     @re_download
-    async def __download(
+    async def __transfer(
         self,
         url: str,
         path: Path,
@@ -207,8 +345,30 @@ class Download:
         mtime: int,
         log,
         bar,
+        id_: str = None,
+        number: int = None,
+        priority: Priority = Priority.NORMAL,
     ):
-        async with self.SEMAPHORE:
+        entry = await self.journal.select(url) if self.journal else None
+        async with self.SCHEDULER.slot(
+            priority,
+            self.__estimate_size(format_, entry),
+        ):
+            if (
+                self.blobs
+                and (blob := await self.blobs.select(url))
+                and await self.__link_blob(
+                    blob,
+                    url,
+                    path,
+                    name,
+                    mtime,
+                    log,
+                    id_,
+                    number,
+                )
+            ):
+                return True
             headers = self.headers.copy()
             # try:
             #     length, suffix = await self.__head_file(
@@ -225,16 +385,30 @@ class Download:
             #     )
             #     return False
             # temp = self.temp.joinpath(f"{name}.{suffix}")
-            temp = self.temp.joinpath(f"{name}.{format_}")
-            self.__update_headers_range(
-                headers,
-                temp,
-            )
+            temp = self.temp.joinpath(f"{self.__temp_name(url)}.{format_}")
+            position = await self.fs.run(self.__check_partial, temp, entry)
             try:
-                async with self.client.stream(
-                    "GET",
+                if entry and entry["LENGTH"] and position == entry["LENGTH"]:
+                    # 上次运行已下载完成但未来得及保存，无需再次请求
+                    return await self.__finalize(
+                        temp,
+                        path,
+                        name,
+                        format_,
+                        url,
+                        mtime,
+                        log,
+                        id_,
+                        number,
+                        await self.fs.run(self.__create_hasher, temp, position),
+                        entry["SUFFIX"],
+                    )
+                self.__update_headers_range(headers, position, entry)
+                # 按延迟与可用状态选择 CDN 域名，缓存文件与下载记录仍以原始链接为准
+                async with self.hosts.stream(
+                    self.client,
                     url,
-                    headers=headers,
+                    headers,
                 ) as response:
                     await sleep_time()
                     if response.status_code == 416:
@@ -242,35 +416,95 @@ class Download:
                             _("文件 {0} 缓存异常，重新下载").format(temp.name),
                         )
                     response.raise_for_status()
-                    # self.__create_progress(
-                    #     bar,
-                    #     int(
-                    #         response.headers.get(
-                    #             'content-length', 0)) or None,
-                    # )
-                    async with open(temp, "ab") as f:
-                        async for chunk in response.aiter_bytes(self.chunk):
+                    validator = self.__get_validator(response)
+                    if position and (
+                        response.status_code != 206
+                        or (
+                            entry["VALIDATOR"]
+                            and validator
+                            and validator != entry["VALIDATOR"]
+                        )
+                    ):
+                        # 服务器忽略范围请求或文件已变化，丢弃已下载部分
+                        position = 0
+                    # 不指定数据块大小，避免重新切分数据产生额外的复制，由写入器合并为较大的写入操作
+                    chunks = response.aiter_bytes()
+                    if position:
+                        first, suffix = b"", entry["SUFFIX"]
+                    else:
+                        # 根据文件开头的数据判断文件格式，下载完成前即可确定最终文件名称
+                        first = await self.__read_start(chunks)
+                        suffix = match_signature(first) or format_
+                    length = self.__get_length(response, position)
+                    await self.__write_journal(
+                        url,
+                        temp,
+                        path,
+                        name,
+                        format_,
+                        length,
+                        validator,
+                        position,
+                        id_,
+                        number,
+                        mtime,
+                        suffix,
+                    )
+                    hasher = await self.fs.run(self.__create_hasher, temp, position)
+                    checksum = self.__create_checksum(response)
+                    self.__create_progress(
+                        bar,
+                        key := f"{name}.{format_}",
+                        length,
+                        position,
+                        id_ or name,
+                    )
+                    async with self.fs.open(
+                        temp,
+                        position,
+                        self.chunk,
+                        length,
+                        self.budget,
+                    ) as f:
+                        async for chunk in self.__prepend(first, chunks):
                             await f.write(chunk)
-                            # self.__update_progress(bar, len(chunk))
-                real = await self.__suffix_with_file(
+                            await self.limiter.acquire(len(chunk))
+                            if hasher:
+                                hasher.update(chunk)
+                            if checksum:
+                                checksum[0].update(chunk)
+                            self.__update_progress(bar, key, len(chunk))
+                    # 响应头中的文件大小为传输数据量，启用内容编码时与解码后的数据量不同
+                    self.__verify(
+                        name,
+                        format_,
+                        length,
+                        position + response.num_bytes_downloaded,
+                        first,
+                        checksum,
+                        not self.__is_encoded(response),
+                    )
+                self.__finish_progress(bar, key)
+                return await self.__finalize(
                     temp,
                     path,
                     name,
-                    # suffix,
                     format_,
-                    log,
-                )
-                self.manager.move(
-                    temp,
-                    real,
+                    url,
                     mtime,
-                    self.write_mtime,
+                    log,
+                    id_,
+                    number,
+                    hasher,
+                    suffix,
                 )
-                # self.__create_progress(bar, None)
-                logging(log, _("文件 {0} 下载成功").format(real.name))
-                return True
             except HTTPError as error:
-                # self.__create_progress(bar, None)
+                self.__finish_progress(bar, f"{name}.{format_}", False)
+                if self.__is_expired(error):
+                    # 下载地址已失效或无权访问时，继续下载没有意义，删除下载日志避免每次启动重复请求
+                    await self.__discard_progress(url, temp)
+                else:
+                    await self.__save_progress(url, temp)
                 logging(
                     log,
                     _("网络异常，{0} 下载失败，错误信息: {1}").format(
@@ -279,27 +513,376 @@ class Download:
                     ERROR,
                 )
                 return False
+            except IntegrityError as error:
+                self.__finish_progress(bar, f"{name}.{format_}", False)
+                if error.resume:
+                    # 数据不完整时保留缓存文件，重试时通过断点续传下载剩余部分
+                    await self.__save_progress(url, temp)
+                else:
+                    await self.__discard_progress(url, temp)
+                logging(log, str(error), ERROR)
+                return False
             except CacheError as error:
-                self.manager.delete(temp)
+                self.__finish_progress(bar, f"{name}.{format_}", False)
+                await self.__discard_progress(url, temp)
                 logging(
                     log,
                     str(error),
                     ERROR,
                 )
+            except BaseException:
+                # 任务取消或发生其他异常时同样记录下载进度，下次运行时继续下载
+                self.__finish_progress(bar, f"{name}.{format_}", False)
+                await self.__save_progress(url, temp)
+                raise
+
+    async def __save_progress(self, url: str, temp: Path):
+        if self.journal:
+            await self.journal.update(
+                url,
+                await self.fs.run(self.__get_resume_byte_position, temp),
+            )
+
+    async def __discard_progress(self, url: str, temp: Path):
+        await self.fs.run(self.manager.delete, temp)
+        if self.journal:
+            await self.journal.delete([url])
+
+    @staticmethod
+    def __is_expired(error: HTTPError) -> bool:
+        # 请求超时与请求频率限制可以稍后重试，其他客户端错误通常为签名过期或文件不存在
+        return (
+            isinstance(error, HTTPStatusError)
+            and 400 <= error.response.status_code < 500
+            and error.response.status_code not in (408, 429)
+        )
+
+    async def __finalize(
+        self,
+        temp: Path,
+        path: Path,
+        name: str,
+        format_: str,
+        url: str,
+        mtime: int,
+        log,
+        id_: str,
+        number: int | None,
+        hasher,
+        suffix: str,
+    ) -> bool:
+        real = path.joinpath(f"{name}.{suffix}")
+        if hasher:
+            hash_ = hasher.hexdigest()
+            size = await self.__place(self.__store_blob, temp, real, hash_, mtime)
+            await self.blobs.add(hash_, real.suffix.lstrip("."), size, url)
+        else:
+            size = await self.__place(self.__save_file, temp, real, mtime)
+        if self.journal:
+            await self.journal.delete([url])
+        await self.__record_file(real, id_, number, size)
+        logging(log, _("文件 {0} 下载成功").format(real.name))
+        return True
+
+    async def __place(self, function, temp: Path, real: Path, *args) -> int:
+        try:
+            return await self.fs.run(function, temp, real, *args)
+        except FileNotFoundError:
+            # 文件夹在运行期间被删除或重命名，重新创建后再次保存
+            await self.fs.mkdir(real.parent, True)
+            return await self.fs.run(function, temp, real, *args)
+
+    async def prepare(self) -> list[dict]:
+        """读取下载日志并清理无法对应下载记录的缓存文件，需要在开始新的下载任务之前完成"""
+        if not self.journal:
+            return []
+        entries = await self.journal.all()
+        await self.fs.run(self.__clean_temp, {i["TEMP"] for i in entries})
+        loop = get_running_loop()
+        for i in entries:
+            # 相同链接的新任务等待继续下载完成
+            self.active[i["URL"]] = loop.create_future()
+        return entries
+
+    async def resume(self, entries: list[dict], log=None, bar=None) -> list:
+        """继续下载上次运行中断的文件"""
+        futures = {i["URL"]: self.active.get(i["URL"]) for i in entries}
+        try:
+            return await self.__gather(
+                [
+                    self.__download(
+                        i["URL"],
+                        Path(i["PATH"]),
+                        i["NAME"],
+                        i["FORMAT"],
+                        i["MTIME"],
+                        log,
+                        bar,
+                        i["ID"],
+                        i["NUMBER"],
+                        Priority.BACKGROUND,
+                        resume=True,
+                    )
+                    for i in entries
+                ]
+            )
+        finally:
+            # 任务取消时未开始的下载任务同样需要释放
+            for url, future in futures.items():
+                if future:
+                    self.__release(url, future, False)
+
+    def __release(self, url: str, future: Future, result: bool):
+        if self.active.get(url) is future:
+            del self.active[url]
+        if not future.done():
+            future.set_result(result)
+
+    async def __gather(self, coroutines: list) -> list:
+        tasks = []
+        try:
+            for coroutine in coroutines:
+                # 排队任务计入内存预算，预算不足时暂停创建新任务，等待已有任务完成
+                await self.budget.acquire(self.TASK_MEMORY)
+                tasks.append(create_task(self.__run_task(coroutine)))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            for coroutine in coroutines[len(tasks) :]:
+                coroutine.close()
+            raise
+        return await gather(*tasks)
+
+    async def __run_task(self, coroutine):
+        try:
+            return await coroutine
+        finally:
+            self.budget.release(self.TASK_MEMORY)
+
+    async def __write_journal(
+        self,
+        url: str,
+        temp: Path,
+        path: Path,
+        name: str,
+        format_: str,
+        length: int | None,
+        validator: str | None,
+        done: int,
+        id_: str,
+        number: int | None,
+        mtime: int,
+        suffix: str,
+    ):
+        if self.journal:
+            await self.journal.add(
+                URL=url,
+                TEMP=str(temp),
+                PATH=str(path),
+                NAME=name,
+                FORMAT=format_,
+                LENGTH=length,
+                VALIDATOR=validator,
+                DONE=done,
+                ID=id_,
+                NUMBER=number,
+                MTIME=mtime,
+                SUFFIX=suffix,
+            )
+
+    @classmethod
+    def __estimate_size(cls, format_: str, entry: dict | None) -> int:
+        if entry and entry["LENGTH"]:
+            return entry["LENGTH"] - max(entry["DONE"] or 0, 0)
+        return cls.ESTIMATE_SIZE.get(format_, cls.DEFAULT_SIZE)
+
+    @staticmethod
+    def __temp_name(url: str) -> str:
+        # 缓存文件名称由下载地址生成，不同作品的同名文件互不影响，重启后仍可对应
+        return sha1(url.encode()).hexdigest()
+
+    def __check_partial(self, temp: Path, entry: dict | None) -> int:
+        if entry and entry["TEMP"] != str(temp) and Path(entry["TEMP"]).is_file():
+            # 缓存文件夹位置变化后，将原有缓存文件移动到新位置继续下载
+            self.manager.move(Path(entry["TEMP"]), temp)
+            entry["TEMP"] = str(temp)
+        position = self.__get_resume_byte_position(temp)
+        if position and (
+            not entry
+            or entry["TEMP"] != str(temp)
+            or (entry["LENGTH"] and position > entry["LENGTH"])
+        ):
+            self.manager.delete(temp)
+            return 0
+        return position
+
+    @classmethod
+    def __create_checksum(cls, response) -> tuple | None:
+        # 服务器提供 Content-MD5 时校验本次响应的数据；该值按编码后的数据计算，启用内容编码时无法校验
+        if cls.__is_encoded(response) or not (
+            value := response.headers.get("Content-MD5")
+        ):
+            return None
+        try:
+            return md5(), b64decode(value, validate=True)
+        except (DecodeError, ValueError):
+            return None
+
+    def __verify(
+        self,
+        name: str,
+        format_: str,
+        length: int | None,
+        received: int,
+        start: bytes,
+        checksum: tuple | None,
+        resume: bool = True,
+    ):
+        if length is not None and received < length:
+            # 启用内容编码时缓存文件为解码后的数据，无法通过范围请求继续下载
+            raise IntegrityError(
+                _("文件 {0} 数据不完整，已下载 {1} 字节，共 {2} 字节").format(
+                    name, received, length
+                ),
+                resume,
+            )
+        if length is not None and received > length:
+            raise IntegrityError(_("文件 {0} 大小异常，重新下载").format(name))
+        if start and not self.__check_signature(start, format_):
+            raise IntegrityError(_("文件 {0} 格式异常，重新下载").format(name))
+        if checksum and checksum[0].digest() != checksum[1]:
+            raise IntegrityError(_("文件 {0} 校验失败，重新下载").format(name))
+
+    @staticmethod
+    def __is_encoded(response) -> bool:
+        return response.headers.get("Content-Encoding", "identity") != "identity"
+
+    @classmethod
+    def __check_signature(cls, start: bytes, format_: str) -> bool:
+        if not (suffix := match_signature(start)):
+            # 无法识别的格式仅在内容为网页或接口数据时视为异常
+            return start.lstrip()[:1] not in (b"<", b"{")
+        return (suffix in cls.VIDEO_SUFFIX) == (format_ in cls.VIDEO_SUFFIX)
+
+    @staticmethod
+    async def __read_start(chunks) -> bytes:
+        # 数据块可能短于文件签名，合并数据块直至足以判断文件格式
+        start = b""
+        while (
+            len(start) < FILE_SIGNATURES_LENGTH
+            and (chunk := await anext(chunks, None)) is not None
+        ):
+            start += chunk
+        return start
+
+    @staticmethod
+    async def __prepend(first: bytes, chunks):
+        if first:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+
+    @staticmethod
+    def __get_validator(response) -> str | None:
+        return response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+    @staticmethod
+    def __get_length(response, position: int) -> int | None:
+        if (r := response.headers.get("Content-Range")) and "/" in r:
+            with suppress(ValueError):
+                return int(r.rsplit("/", 1)[1])
+        if length := response.headers.get("Content-Length"):
+            return int(length) + position
+        return None
+
+    def __create_hasher(self, temp: Path, position: int):
+        if not self.blobs:
+            return None
+        hasher = sha256()
+        if position:
+            # 断点续传时需要先计算已下载部分的哈希值
+            with temp.open("rb") as f:
+                while data := f.read(self.chunk):
+                    hasher.update(data)
+        return hasher
+
+    def __clean_temp(self, known: set[str]):
+        for file in self.temp.iterdir():
+            if file.is_file() and str(file) not in known:
+                self.manager.delete(file)
+
+    def __save_file(self, temp: Path, real: Path, mtime: int) -> int:
+        # 移动文件、修改时间与读取大小合并为一次线程池操作
+        self.manager.move(temp, real)
+        if self.write_mtime and mtime:
+            self.manager.update_mtime(real, mtime)
+        return real.stat().st_size
+
+    def __store_blob(
+        self,
+        temp: Path,
+        real: Path,
+        hash_: str,
+        mtime: int,
+    ) -> int:
+        blob = self.blobs.path(hash_, real.suffix.lstrip("."))
+        size = temp.stat().st_size
+        if blob.is_file():
+            self.manager.delete(temp)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            self.manager.move(temp, blob)
+        self.__link_file(blob, real, mtime)
+        return size
+
+    def __link_file(self, blob: Path, real: Path, mtime: int) -> int:
+        # 硬链接与去重存储共享同一个文件，修改时间会影响全部链接，因此不写入作品发布时间
+        if not self.manager.link(blob, real) and self.write_mtime and mtime:
+            self.manager.update_mtime(real, mtime)
+        return real.stat().st_size
+
+    async def __link_blob(
+        self,
+        blob: Path,
+        url: str,
+        path: Path,
+        name: str,
+        mtime: int,
+        log,
+        id_: str,
+        number: int | None,
+    ) -> bool:
+        real = path.joinpath(f"{name}{blob.suffix}")
+        try:
+            size = await self.fs.run(self.__link_file, blob, real, mtime)
+        except FileNotFoundError:
+            # 去重存储中的文件已被删除，重新下载
+            return False
+        await self.blobs.link(url)
+        await self.__record_file(real, id_, number, size)
+        logging(log, _("文件 {0} 内容已存在，创建链接成功").format(real.name))
+        return True
 
     @staticmethod
     def __create_progress(
-        bar,
+        bar: "TransferProgress",
+        name: str,
         total: int | None,
-        completed=0,
+        completed: int,
+        work: str,
     ):
         if bar:
-            bar.update(total=total, completed=completed)
+            bar.start(name, total, completed, work)
 
     @staticmethod
-    def __update_progress(bar, advance: int):
+    def __update_progress(bar: "TransferProgress", name: str, advance: int):
         if bar:
-            bar.advance(advance)
+            bar.advance(name, advance)
+
+    @staticmethod
+    def __finish_progress(bar: "TransferProgress", name: str, success=True):
+        if bar:
+            bar.finish(name, success)
 
     @classmethod
     def __extract_type(cls, content: str) -> str:
@@ -325,34 +908,12 @@ class Download:
     def __get_resume_byte_position(file: Path) -> int:
         return file.stat().st_size if file.is_file() else 0
 
+    @staticmethod
     def __update_headers_range(
-        self,
         headers: dict[str, str],
-        file: Path,
-    ) -> int:
-        headers["Range"] = f"bytes={(p := self.__get_resume_byte_position(file))}-"
-        return p
-
-    @staticmethod
-    async def __suffix_with_file(
-        temp: Path,
-        path: Path,
-        name: str,
-        default_suffix: str,
-        log,
-    ) -> Path:
-        try:
-            async with open(temp, "rb") as f:
-                file_start = await f.read(FILE_SIGNATURES_LENGTH)
-            for offset, signature, suffix in FILE_SIGNATURES:
-                if file_start[offset : offset + len(signature)] == signature:
-                    return path.joinpath(f"{name}.{suffix}")
-        except Exception as error:
-            logging(
-                log,
-                _("文件 {0} 格式判断失败，错误信息：{1}").format(
-                    temp.name, repr(error)
-                ),
-                ERROR,
-            )
-        return path.joinpath(f"{name}.{default_suffix}")
+        position: int,
+        entry: dict | None,
+    ):
+        headers["Range"] = f"bytes={position}-"
+        if position and entry and entry["VALIDATOR"]:
+            headers["If-Range"] = entry["VALIDATOR"]
@@ -1,60 +1,85 @@
 from source.expansion import Namespace
 
+from ..module import CDN_HOSTS
 from .request import Html
+from .video import Video
 
 __all__ = ["Image"]
 
 
 class Image:
     @classmethod
-    def get_image_link(cls, data: Namespace, format_: str) -> tuple[list, list]:
+    def get_image_link(
+        cls,
+        data: Namespace,
+        format_: str,
+        live_quality: str = "h264",
+    ) -> tuple[list, list, list]:
         images = data.safe_extract("imageList", [])
-        live_link = cls.__get_live_link(images)
+        live_link, live_backup = cls.__get_live_link(images, live_quality)
         token_list = [
             cls.__extract_image_token(Namespace.object_extract(i, "urlDefault"))
             for i in images
         ]
         match format_:
             case "png" | "webp" | "jpeg" | "heic" | "avif":
-                return [
-                    Html.format_url(
-                        cls.__generate_fixed_link(
-                            i,
-                            format_,
+                return (
+                    [
+                        Html.format_url(
+                            cls.__generate_fixed_link(
+                                i,
+                                format_,
+                            )
                         )
-                    )
-                    for i in token_list
-                ], live_link
+                        for i in token_list
+                    ],
+                    live_link,
+                    live_backup,
+                )
             case "auto":
-                return [
-                    Html.format_url(cls.__generate_auto_link(i)) for i in token_list
-                ], live_link
+                return (
+                    [Html.format_url(cls.__generate_auto_link(i)) for i in token_list],
+                    live_link,
+                    live_backup,
+                )
             case _:
                 raise ValueError
 
     @staticmethod
     def __generate_auto_link(token: str) -> str:
-        return f"https://sns-img-bd.xhscdn.com/{token}"
+        return f"https://{CDN_HOSTS['original']}/{token}"
 
     @staticmethod
     def __generate_fixed_link(
         token: str,
         format_: str,
     ) -> str:
-        return f"https://ci.xiaohongshu.com/{token}?imageView2/format/{format_}?"
+        return f"https://{CDN_HOSTS['image']}/{token}?imageView2/format/{format_}?"
 
     @staticmethod
     def __extract_image_token(url: str) -> str:
         return "/".join(url.split("/")[5:]).split("!")[0]
 
-    @staticmethod
-    def __get_live_link(items: list) -> list:
-        return [
-            (
-                Html.format_url(
-                    Namespace.object_extract(item, "stream.h264[0].masterUrl")
-                )
-                or None
+    @classmethod
+    def __get_live_link(cls, items: list, quality: str) -> tuple[list, list]:
+        """返回每张图片选中的动图地址与备用地址，不包含动图的图片对应 None 与空列表"""
+        links, backups = [], []
+        for item in items:
+            stream = cls.__select_live_stream(
+                Video.extract_streams(Namespace.object_extract(item, "stream", {})),
+                quality,
             )
-            for item in items
-        ]
+            links.append(stream["地址"] if stream else None)
+            backups.append(stream["备用地址"] if stream else [])
+        return links, backups
+
+    @staticmethod
+    def __select_live_stream(streams: list[dict], quality: str) -> dict | None:
+        match quality:
+            case "best" | "smallest":
+                return Video.select_stream(streams, quality)
+        # 优先选择指定编码的第一个动图流，与网页端的选择方式一致
+        return next(
+            (i for i in streams if i["编码"] == quality),
+            streams[0] if streams else None,
+        )
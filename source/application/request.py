@@ -1,8 +1,10 @@
+from functools import partial
 from typing import TYPE_CHECKING
 
-from httpx import HTTPError
+from httpx import AsyncClient, HTTPError, Response
 from httpx import get
 
+from ..expansion import StateScanner
 from ..module import ERROR, Manager, logging, retry, sleep_time
 from ..translation import _
 
@@ -21,6 +23,8 @@ class Html:
         self.client = manager.request_client
         self.headers = manager.headers
         self.timeout = manager.timeout
+        self.hedge = manager.hedge
+        self.hedge_client = manager.hedge_client or self.client
 
     @retry
     async def request_url(
@@ -30,6 +34,7 @@ class Html:
         log=None,
         cookie: str = None,
         proxy: str = None,
+        state=False,
         **kwargs,
     ) -> str:
         headers = self.update_cookie(
@@ -37,12 +42,18 @@ class Html:
         )
         try:
             match bool(proxy):
+                case False if state and content:
+                    response = await self.__hedge(url, headers, **kwargs)
+                    text = await self.__read_state(response)
+                    await sleep_time()
+                    return text
                 case False:
-                    response = await self.__request_url_get(
-                        url,
-                        headers,
-                        **kwargs,
-                    )
+                    # 首个响应的等待时间超过近期耗时的百分位时发送对冲请求，使用先返回的响应
+                    response = await self.__hedge(url, headers, **kwargs)
+                    try:
+                        await response.aread()
+                    finally:
+                        await response.aclose()
                     await sleep_time()
                     response.raise_for_status()
                     return response.text if content else str(response.url)
@@ -103,18 +114,56 @@ class Html:
             **kwargs,
         )
 
-    async def __request_url_get(
+    async def __hedge(
         self,
         url: str,
         headers: dict,
         **kwargs,
-    ):
-        return await self.client.get(
-            url,
-            headers=headers,
-            **kwargs,
+    ) -> Response:
+        return await self.hedge.run(
+            partial(self.__request_url_send, url, headers, **kwargs),
+            partial(
+                self.__request_url_send,
+                url,
+                headers,
+                self.hedge_client,
+                **kwargs,
+            ),
+            Response.aclose,
         )
 
+    async def __request_url_send(
+        self,
+        url: str,
+        headers: dict,
+        client: AsyncClient = None,
+        **kwargs,
+    ) -> Response:
+        """收到响应头时返回，响应内容由调用方读取"""
+        client = client or self.client
+        return await client.send(
+            client.build_request(
+                "GET",
+                url,
+                headers=headers,
+                **kwargs,
+            ),
+            stream=True,
+        )
+
+    @staticmethod
+    async def __read_state(response: Response) -> str:
+        scanner = StateScanner()
+        try:
+            response.raise_for_status()
+            async for chunk in response.aiter_text():
+                if scanner.feed(chunk):
+                    # 脚本已完整，提前关闭连接，不再读取网页剩余内容
+                    break
+        finally:
+            await response.aclose()
+        return scanner.content()
+
     async def __request_url_get_proxy(
         self,
         url: str,
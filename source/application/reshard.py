@@ -0,0 +1,170 @@
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from re import compile
+from typing import TYPE_CHECKING, Callable
+
+from ..module import ERROR, INFO, WARNING, logging
+from ..translation import _
+from .explore import Explore
+
+if TYPE_CHECKING:
+    from ..module import DataRecorder, FileRecorder, Manager
+
+__all__ = ["Reshard"]
+
+
+class Reshard:
+    """按当前分片方式移动已下载文件，作者 ID 与发布时间来自作品数据记录"""
+
+    # 作品 ID 为 24 位十六进制字符
+    ID = compile(r"[0-9a-f]{24}")
+    NUMBER = compile(r"_\d+$")
+
+    def __init__(
+        self,
+        manager: "Manager",
+        file_recorder: "FileRecorder",
+        data_recorder: "DataRecorder",
+        naming: Callable[[dict], str],
+    ):
+        self.manager = manager
+        self.folder = manager.folder
+        self.fs = manager.filesystem
+        self.file_recorder = file_recorder
+        self.data_recorder = data_recorder
+        self.naming = naming
+
+    async def run(self, log=None) -> int:
+        if not self.data_recorder.switch:
+            logging(log, _("作品数据记录功能未开启，无法迁移文件"), WARNING)
+            return 0
+        if not self.file_recorder.switch:
+            logging(log, _("文件索引功能未开启，无法迁移文件"), WARNING)
+            return 0
+        if not (files := await self.file_recorder.all()):
+            # 旧版本下载的文件没有索引，先扫描下载文件夹建立索引
+            await self.file_recorder.rebuild()
+            files = await self.file_recorder.all()
+        data = await self.data_recorder.all()
+        records = {
+            i["作品ID"]: (i["作者ID"], self.__parse_time(i["发布时间"])) for i in data
+        }
+        if derived := self.__derive_id(files, records, data):
+            await self.file_recorder.update_id(derived)
+            files = [(i[0], derived.get(i[0], i[1]), *i[2:]) for i in files]
+        moves, skipped = self.__plan(files, records)
+        done, failed = await self.fs.run(self.__execute, moves)
+        await self.file_recorder.rename(done)
+        for path, error in failed:
+            logging(
+                log,
+                _("文件 {0} 移动失败，错误信息：{1}").format(path, repr(error)),
+                ERROR,
+            )
+        logging(
+            log,
+            _("文件迁移完成，已移动 {0} 个文件，跳过 {1} 个缺少作品数据的文件").format(
+                len(done),
+                skipped,
+            ),
+            WARNING if skipped or failed or len(done) < len(moves) else INFO,
+        )
+        return len(done)
+
+    def __derive_id(
+        self,
+        files: list[tuple],
+        records: dict[str, tuple],
+        data: list[dict],
+    ) -> dict[str, str]:
+        """索引中缺少作品 ID 的文件，根据文件路径中的作品 ID 或按命名规则生成的文件名称匹配作品"""
+        names = {}
+        for item in data:
+            with suppress(KeyError, TypeError, AttributeError):
+                names.setdefault(self.naming(item), item["作品ID"])
+        return {
+            path: id_
+            for path, id_ in (
+                (i[0], self.__match_id(Path(i[0]), records, names))
+                for i in files
+                if not i[1]
+            )
+            if id_
+        }
+
+    def __match_id(
+        self,
+        path: Path,
+        records: dict[str, tuple],
+        names: dict[str, str],
+    ) -> str | None:
+        with suppress(ValueError):
+            path = path.relative_to(self.folder)
+        for part in reversed(path.parts):
+            for id_ in self.ID.findall(part):
+                if id_ in records:
+                    return id_
+        # 图文作品的文件名称带有序号后缀；文件夹模式下作品文件夹名称与文件名称相同
+        return names.get(self.NUMBER.sub("", path.stem)) or names.get(path.parent.name)
+
+    @staticmethod
+    def __parse_time(value: str) -> datetime | None:
+        with suppress(TypeError, ValueError):
+            return datetime.strptime(value, Explore.time_format)
+
+    def __plan(
+        self,
+        files: list[tuple],
+        records: dict[str, tuple],
+    ) -> tuple[list[tuple[Path, Path]], int]:
+        moves = []
+        skipped = 0
+        for path, id_, *__ in files:
+            path = Path(path)
+            if not (record := records.get(id_)):
+                skipped += 1
+                continue
+            try:
+                parts = path.relative_to(self.folder).parts
+            except ValueError:
+                skipped += 1
+                continue
+            # 去除文件当前所在的分片文件夹，无论此前使用哪种分片方式
+            if len(parts) > 1 and parts[0] in {
+                self.manager.shard(*record, i) for i in self.manager.SHARDS
+            }:
+                parts = parts[1:]
+            target = self.folder.joinpath(self.manager.shard(*record), *parts)
+            if target != path:
+                moves.append((path, target))
+        return moves, skipped
+
+    def __execute(
+        self,
+        moves: list[tuple[Path, Path]],
+    ) -> tuple[list[tuple[Path, Path]], list[tuple[Path, OSError]]]:
+        done, failed = [], []
+        folders = set()
+        for old, new in moves:
+            if not old.is_file() or new.exists():
+                continue
+            try:
+                new.parent.mkdir(parents=True, exist_ok=True)
+                # 跨文件系统时退回为复制后删除
+                self.manager.move(old, new)
+            except OSError as error:
+                # 单个文件移动失败不影响其他文件，已移动的文件仍需更新索引
+                failed.append((old, error))
+                continue
+            done.append((old, new))
+            folders.update(
+                i
+                for i in old.parents
+                if i.is_relative_to(self.folder) and i != self.folder
+            )
+        # 文件移出后，仅删除涉及的空文件夹，不遍历整个下载文件夹
+        for folder in sorted(folders, key=lambda i: len(i.parts), reverse=True):
+            with suppress(OSError):
+                folder.rmdir()
+        return done, failed
@@ -1,4 +1,5 @@
 from source.expansion import Namespace
+from ..module import CDN_HOSTS
 from .request import Html
 
 __all__ = ["Video"]
@@ -10,11 +11,98 @@ class Video:
         "consumer",
         "originVideoKey",
     )
+    VIDEO_STREAM = (
+        "video",
+        "media",
+        "stream",
+    )
+    CODECS = (
+        "h264",
+        "h265",
+        "av1",
+    )
+
+    @classmethod
+    def get_video_link(
+        cls,
+        data: Namespace,
+        quality: str = "origin",
+        codec: str = "",
+    ) -> tuple[list, list[dict]]:
+        streams = cls.get_video_streams(data)
+        origin = cls.__get_origin_link(data)
+        if quality == "origin" and origin:
+            return [origin], streams
+        if selected := cls.select_stream(streams, quality, codec):
+            selected["已选择"] = True
+            return [selected["地址"]], streams
+        return ([origin] if origin else []), streams
 
     @classmethod
-    def get_video_link(cls, data: Namespace) -> list:
+    def __get_origin_link(cls, data: Namespace) -> str:
         return (
-            [Html.format_url(f"https://sns-video-bd.xhscdn.com/{t}")]
+            Html.format_url(f"https://{CDN_HOSTS['video']}/{t}")
             if (t := data.safe_extract(".".join(cls.VIDEO_LINK)))
-            else []
+            else ""
         )
+
+    @classmethod
+    def get_video_streams(cls, data: Namespace) -> list[dict]:
+        """提取作品全部视频流的编码、分辨率、码率与文件大小"""
+        return cls.extract_streams(data.safe_extract(".".join(cls.VIDEO_STREAM), {}))
+
+    @classmethod
+    def extract_streams(cls, stream) -> list[dict]:
+        return [
+            {
+                "编码": codec,
+                "宽度": Namespace.object_extract(item, "width", 0),
+                "高度": Namespace.object_extract(item, "height", 0),
+                "码率": Namespace.object_extract(item, "avgBitrate", 0),
+                "大小": Namespace.object_extract(item, "size", 0),
+                "地址": Html.format_url(url),
+                "备用地址": [
+                    Html.format_url(i)
+                    for i in Namespace.object_extract(item, "backupUrls", [])
+                    if i
+                ],
+                "已选择": False,
+            }
+            for codec in cls.CODECS
+            for item in Namespace.object_extract(stream, codec, [])
+            if (url := Namespace.object_extract(item, "masterUrl"))
+        ]
+
+    @classmethod
+    def select_stream(
+        cls,
+        streams: list[dict],
+        quality: str,
+        codec: str = "",
+    ) -> dict | None:
+        """按画质策略选择视频流；优先选择指定编码，该编码不存在时从全部视频流中选择"""
+        if codec and (preferred := [i for i in streams if i["编码"] == codec]):
+            streams = preferred
+        if not streams:
+            return None
+        match quality:
+            case "smallest":
+                return min(streams, key=cls.__weight)
+            case height if height.isdigit():
+                # 按视频短边比较分辨率，横屏与竖屏视频使用相同的标准
+                if fitted := [i for i in streams if cls.__resolution(i) <= int(height)]:
+                    return max(fitted, key=cls.__rank)
+                return min(streams, key=cls.__weight)
+        return max(streams, key=cls.__rank)
+
+    @staticmethod
+    def __resolution(stream: dict) -> int:
+        return min(stream["宽度"], stream["高度"])
+
+    @classmethod
+    def __rank(cls, stream: dict) -> tuple:
+        return cls.__resolution(stream), stream["码率"], stream["大小"]
+
+    @staticmethod
+    def __weight(stream: dict) -> tuple:
+        return stream["大小"] or stream["码率"], stream["码率"]
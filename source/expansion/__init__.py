@@ -1,10 +1,23 @@
 from .browser import BrowserCookie
+from .budget import MemoryBudget
+from .cdn import HostPool
 from .cleaner import Cleaner
 from .converter import Converter
+from .converter import StateScanner
 from .error import CacheError
+from .error import IntegrityError
 from .file_folder import file_switch
 from .file_folder import remove_empty_directories
+from .filesystem import FileSystem
+from .hedge import HedgePolicy
+from .hedge import race
+from .limiter import BandwidthLimiter
 from .namespace import Namespace
+from .pool import BufferPool
+from .progress import TransferProgress
+from .scheduler import Priority
+from .scheduler import Scheduler
 from .truncate import beautify_string
 from .truncate import trim_string
 from .truncate import truncate_string
+from .writer import ChunkWriter
@@ -0,0 +1,74 @@
+from asyncio import Future, get_running_loop
+from collections import deque
+
+__all__ = ["MemoryBudget"]
+
+
+class MemoryBudget:
+    """所有下载任务共享的内存预算；单位：字节，0 表示不限制
+
+    新任务进入队列前需要申请预算，预算不足时等待，对任务生产者形成背压；
+    正在下载的任务申请缓冲区时不会等待，避免持有缓冲区的任务相互等待。
+    """
+
+    def __init__(self, limit: float = 0):
+        self.limit = 0
+        self.set_limit(limit)
+        self.usage = 0
+        self.peak = 0
+        self.waiting: deque[tuple[int, Future]] = deque()
+
+    def set_limit(self, limit: float = None):
+        """设置内存预算，单位：MB"""
+        if limit is not None:
+            self.limit = max(int(float(limit) * 1024 * 1024), 0)
+
+    def __fits(self, size: int) -> bool:
+        # 预算为空时总是允许申请，单次申请超过预算也不会永久等待
+        return not self.limit or not self.usage or self.usage + size <= self.limit
+
+    def __add(self, size: int):
+        self.usage += size
+        self.peak = max(self.peak, self.usage)
+
+    async def acquire(self, size: int):
+        if not self.waiting and self.__fits(size):
+            self.__add(size)
+            return
+        future = get_running_loop().create_future()
+        self.waiting.append((size, future))
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release(size)
+            else:
+                self.waiting.remove((size, future))
+                self.release(0)
+            raise
+
+    def try_acquire(self, size: int) -> bool:
+        if self.waiting or not self.__fits(size):
+            return False
+        self.__add(size)
+        return True
+
+    def reserve(self, size: int):
+        """不等待，直接计入内存占用"""
+        self.__add(size)
+
+    def release(self, size: int):
+        self.usage = max(self.usage - size, 0)
+        while self.waiting and self.__fits(self.waiting[0][0]):
+            size, future = self.waiting.popleft()
+            if not future.done():
+                self.__add(size)
+                future.set_result(None)
+
+    def status(self) -> dict:
+        return {
+            "limit": self.limit,
+            "usage": self.usage,
+            "peak": self.peak,
+            "waiting": len(self.waiting),
+        }
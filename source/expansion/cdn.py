@@ -0,0 +1,162 @@
+from asyncio import CancelledError
+from contextlib import asynccontextmanager
+from functools import partial
+from time import monotonic
+from urllib.parse import urlsplit
+
+from httpx import AsyncClient, HTTPError, Response
+
+from .hedge import race
+
+__all__ = ["HostPool"]
+
+
+class HostPool:
+    """按媒体类型管理 CDN 域名，记录每个域名的首字节延迟与失败次数，下载时优先使用最快的可用域名"""
+
+    # 首字节延迟指数移动平均的权重
+    ALPHA = 0.3
+    # 连续失败达到该次数后暂停使用该域名，暂停时长单位：秒
+    FAILURES = 2
+    COOLDOWN = 60
+
+    def __init__(
+        self,
+        defaults: dict[str, str],
+        hosts: dict[str, list[str]] = None,
+        hedge: float = 0,
+    ):
+        self.groups: dict[str, list[str]] = {}
+        self.types: dict[str, str] = {}
+        self.__set_hosts(defaults, hosts or {})
+        # 首字节等待时间超过该值时，向下一个域名发送相同请求；单位：秒，0 表示不启用
+        self.hedge = max(float(hedge or 0), 0.0)
+        self.latency: dict[str, float] = {}
+        self.failures: dict[str, int] = {}
+        self.disabled: dict[str, float] = {}
+        self.hedges = 0
+        self.wins = 0
+
+    def __set_hosts(self, defaults: dict[str, str], hosts: dict[str, list[str]]):
+        for type_, default in defaults.items():
+            group = [i for i in hosts.get(type_) or () if i] or [default]
+            self.groups[type_] = group
+            # 作品数据中的默认域名同样替换为设置的域名
+            for host in (*group, default):
+                self.types.setdefault(host, type_)
+
+    def candidates(self, url: str) -> list[str]:
+        """返回按优先级排序的候选链接，不属于任何媒体类型的链接保持不变"""
+        parts = urlsplit(url)
+        if not (type_ := self.types.get(parts.netloc)):
+            return [url]
+        now = monotonic()
+        hosts = sorted(
+            self.groups[type_],
+            key=lambda i: (
+                self.disabled.get(i, 0) > now,
+                self.failures.get(i, 0),
+                self.latency.get(i, 0),
+            ),
+        )
+        return [parts._replace(netloc=i).geturl() for i in hosts]
+
+    def success(self, host: str, latency: float):
+        self.failures.pop(host, None)
+        self.disabled.pop(host, None)
+        self.__observe(host, latency)
+
+    def __observe(self, host: str, latency: float):
+        if (previous := self.latency.get(host)) is None:
+            self.latency[host] = latency
+        else:
+            self.latency[host] = previous + (latency - previous) * self.ALPHA
+
+    def failure(self, host: str):
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if self.failures[host] >= self.FAILURES:
+            self.disabled[host] = monotonic() + self.COOLDOWN
+
+    @asynccontextmanager
+    async def stream(self, client: AsyncClient, url: str, headers: dict):
+        """按优先级选择域名发送请求，与 AsyncClient.stream 用法相同"""
+        urls = self.candidates(url)
+        if self.hedge and len(urls) > 1:
+            host, response = await self.__hedge(client, urls[:2], headers)
+        else:
+            host, response = await self.__request(client, urls[0], headers)
+        try:
+            yield response
+        except HTTPError:
+            # 包含响应状态码异常与读取数据时的网络异常
+            self.failure(host)
+            raise
+        finally:
+            await response.aclose()
+
+    async def __request(
+        self,
+        client: AsyncClient,
+        url: str,
+        headers: dict,
+    ) -> tuple[str, Response]:
+        host = urlsplit(url).netloc
+        start = monotonic()
+        try:
+            response = await client.send(
+                client.build_request("GET", url, headers=headers),
+                stream=True,
+            )
+        except HTTPError:
+            self.failure(host)
+            raise
+        except CancelledError:
+            # 对冲时落后的请求被取消，已等待的时间即为延迟的下限
+            self.__observe(host, monotonic() - start)
+            raise
+        self.success(host, monotonic() - start)
+        return host, response
+
+    async def __hedge(
+        self,
+        client: AsyncClient,
+        urls: list[str],
+        headers: dict,
+    ) -> tuple[str, Response]:
+        index, result = await race(
+            partial(self.__request, client, urls[0], headers),
+            partial(self.__request, client, urls[1], headers),
+            self.hedge,
+            self.__allow,
+            self.__discard,
+        )
+        if index:
+            self.wins += 1
+        return result
+
+    def __allow(self) -> bool:
+        self.hedges += 1
+        return True
+
+    @staticmethod
+    async def __discard(result: tuple[str, Response]):
+        await result[1].aclose()
+
+    def status(self) -> dict:
+        now = monotonic()
+        return {
+            "hedge": self.hedge,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "hosts": {
+                host: {
+                    "type": type_,
+                    "latency": round(i, 6)
+                    if (i := self.latency.get(host)) is not None
+                    else None,
+                    "failures": self.failures.get(host, 0),
+                    "available": self.disabled.get(host, 0) <= now,
+                }
+                for host, type_ in self.types.items()
+            },
+        }
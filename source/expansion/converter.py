@@ -3,7 +3,7 @@ from typing import Union
 from lxml.etree import HTML
 from yaml import safe_load
 
-__all__ = ["Converter"]
+__all__ = ["Converter", "StateScanner"]
 
 
 class Converter:
@@ -21,6 +21,9 @@ class Converter:
     def _extract_object(self, html: str) -> str:
         if not html:
             return ""
+        if html.startswith(StateScanner.START):
+            # 流式请求已提取脚本内容，无需解析网页
+            return html
         html_tree = HTML(html)
         scripts = html_tree.xpath(self.INITIAL_STATE)
         return self.get_script(scripts)
@@ -62,3 +65,39 @@ class Converter:
             if script.startswith("window.__INITIAL_STATE__"):
                 return script
         return ""
+
+
+class StateScanner:
+    """逐块扫描网页内容，__INITIAL_STATE__ 脚本结束后即可停止读取网页剩余内容"""
+
+    START = "window.__INITIAL_STATE__="
+    END = "</script>"
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.state: list[str] | None = None
+        # 上一个数据块末尾的内容，用于匹配跨越两个数据块的标记
+        self.tail = ""
+        self.result = ""
+
+    def feed(self, chunk: str) -> bool:
+        """返回 True 表示脚本已完整"""
+        self.chunks.append(chunk)
+        if self.state is None:
+            window = self.tail + chunk
+            if (index := window.find(self.START)) < 0:
+                self.tail = window[1 - len(self.START) :]
+                return False
+            self.state, self.tail, chunk = [], "", window[index:]
+        self.state.append(chunk)
+        window = self.tail + chunk
+        if self.END not in window:
+            self.tail = window[1 - len(self.END) :]
+            return False
+        text = "".join(self.state)
+        self.result = text[: text.find(self.END)]
+        return True
+
+    def content(self) -> str:
+        """返回脚本内容；未找到完整脚本时返回已读取的全部网页内容"""
+        return self.result or "".join(self.chunks)
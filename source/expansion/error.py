@@ -5,3 +5,10 @@ class CacheError(Exception):
 
     def __str__(self):
         return self.message
+
+
+class IntegrityError(CacheError):
+    def __init__(self, message: str, resume: bool = False):
+        super().__init__(message)
+        # 为真时保留已下载的数据，重新请求剩余部分
+        self.resume = resume
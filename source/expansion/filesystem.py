@@ -0,0 +1,156 @@
+from asyncio import Future, Semaphore, ensure_future, get_running_loop, shield
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable
+
+from .budget import MemoryBudget
+from .pool import BufferPool
+from .writer import ChunkWriter
+
+__all__ = ["FileSystem"]
+
+
+class FileSystem:
+    """在专用线程池中执行阻塞的文件系统操作；排队任务数量有上限，超出上限时调用方等待"""
+
+    MAX_WORKERS = 4
+    MAX_QUEUE = 64
+
+    def __init__(
+        self,
+        workers: int = MAX_WORKERS,
+        queue: int = MAX_QUEUE,
+        offload: bool = True,
+    ):
+        self.offload = offload
+        self.pool = BufferPool()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="FileSystem",
+        )
+        # 所有下载任务共用一个写入线程，按顺序写入文件数据
+        self.writer = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="ChunkWriter",
+        )
+        self.queue = Semaphore(queue)
+        self.folders: dict[Path, Future] = {}
+        # 本次运行中创建的文件夹，关闭时仅检查这些文件夹是否为空
+        self.created: set[Path] = set()
+        self.lock = Lock()
+        self.operations = 0
+        self.waiting = 0
+        # 事件循环线程中花费的时间，关闭 offload 时即为文件操作阻塞事件循环的总时长
+        self.blocking = 0.0
+        # 线程池中执行文件操作花费的时间
+        self.working = 0.0
+
+    async def run(self, function: Callable, *args) -> Any:
+        if not self.offload:
+            start = perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.__record(perf_counter() - start)
+        self.waiting += 1
+        async with self.queue:
+            self.waiting -= 1
+            start = perf_counter()
+            future = get_running_loop().run_in_executor(
+                self.executor,
+                self.__execute,
+                function,
+                *args,
+            )
+            with self.lock:
+                self.blocking += perf_counter() - start
+            return await future
+
+    def __execute(self, function: Callable, *args) -> Any:
+        start = perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.__record(perf_counter() - start, False)
+
+    def __record(self, elapsed: float, blocking: bool = True):
+        with self.lock:
+            self.operations += 1
+            if blocking:
+                self.blocking += elapsed
+            self.working += elapsed
+
+    async def mkdir(self, path: Path, refresh: bool = False):
+        """同一文件夹仅创建一次，并发请求共用同一个操作"""
+        # 命中缓存时不检查文件夹是否存在，文件夹在运行期间被删除时，调用方写入失败后使用 refresh 重新创建
+        if not (future := self.folders.get(path)) or (refresh and future.done()):
+            future = self.folders[path] = ensure_future(self.__create(path))
+        try:
+            # 某个调用方被取消时不影响其他等待同一文件夹的调用方
+            await shield(future)
+        except OSError:
+            self.folders.pop(path, None)
+            raise
+
+    async def __create(self, path: Path):
+        self.created.update(await self.run(self.__mkdir, path))
+
+    @staticmethod
+    def __mkdir(path: Path) -> list[Path]:
+        missing = []
+        for folder in (path, *path.parents):
+            if folder.exists():
+                break
+            missing.append(folder)
+        path.mkdir(parents=True, exist_ok=True)
+        return missing
+
+    async def clean(self):
+        """删除本次运行中创建且仍为空的文件夹，不遍历整个下载文件夹"""
+        folders = sorted(self.created, key=lambda i: len(i.parts), reverse=True)
+        self.created.clear()
+        self.folders.clear()
+        await self.run(self.__remove_folders, folders)
+
+    @staticmethod
+    def __remove_folders(folders: list[Path]):
+        for folder in folders:
+            with suppress(OSError):
+                folder.rmdir()
+
+    def open(
+        self,
+        path: Path,
+        position: int,
+        size: int,
+        length: int = None,
+        budget: MemoryBudget = None,
+    ) -> ChunkWriter:
+        return ChunkWriter(
+            self.writer,
+            path,
+            position,
+            size,
+            length,
+            budget,
+            self.pool,
+        )
+
+    def status(self) -> dict:
+        return {
+            "offload": self.offload,
+            "operations": self.operations,
+            "waiting": self.waiting,
+            "blocking": round(self.blocking, 6),
+            "working": round(self.working, 6),
+            "buffers": self.pool.status(),
+        }
+
+    def close(self):
+        # 关闭后的文件操作直接在调用线程中执行
+        self.offload = False
+        self.executor.shutdown(wait=True)
+        self.writer.shutdown(wait=True)
@@ -0,0 +1,120 @@
+from asyncio import FIRST_COMPLETED, create_task, gather, wait
+from collections import deque
+from time import monotonic
+from typing import Any, Awaitable, Callable
+
+__all__ = ["HedgePolicy", "race"]
+
+
+async def race(
+    primary: Callable[[], Awaitable],
+    secondary: Callable[[], Awaitable],
+    delay: float = None,
+    allow: Callable[[], bool] = None,
+    discard: Callable[[Any], Awaitable] = None,
+) -> tuple[int, Any]:
+    """发送 primary 请求，超过 delay 秒未完成且 allow 允许时发送 secondary 对冲请求
+
+    返回先成功的请求序号与结果；全部失败时抛出首个请求的异常。
+    退出时取消全部未胜出的请求，包括调用方被取消的情况，已完成请求的结果交给 discard 释放。
+    """
+    tasks, winner = [], None
+    try:
+        tasks.append(create_task(primary()))
+        if delay is not None:
+            done, __ = await wait(tasks, timeout=delay)
+            if not done and (not allow or allow()):
+                tasks.append(create_task(secondary()))
+        pending = set(tasks)
+        while pending and not winner:
+            done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+            winner = next(
+                (i for i in tasks if i in done and not i.exception()),
+                None,
+            )
+        if not winner:
+            raise tasks[0].exception()
+        return tasks.index(winner), winner.result()
+    finally:
+        losers = [i for i in tasks if i is not winner]
+        for task in losers:
+            task.cancel()
+        for result in await gather(*losers, return_exceptions=True):
+            # 同时完成的其他请求需要释放结果占用的资源，例如关闭响应
+            if discard and not isinstance(result, BaseException):
+                await discard(result)
+
+
+class HedgePolicy:
+    """对冲请求策略：请求耗时超过近期耗时的指定百分位时，发送第二个相同请求，使用先完成的结果
+
+    对冲请求数量不超过请求总数的指定百分比，budget 为 0 表示不启用。
+    """
+
+    WINDOW = 200
+    # 样本数量不足时无法估计耗时分布，不发送对冲请求
+    SAMPLES = 20
+    PERCENTILE = 95
+    # 对冲延迟的下限，单位：秒
+    MIN_DELAY = 0.05
+
+    def __init__(self, budget: float = 0, percentile: float = PERCENTILE):
+        self.budget = 0.0
+        self.set_budget(budget)
+        self.percentile = min(max(float(percentile), 1), 100)
+        self.samples: deque[float] = deque(maxlen=self.WINDOW)
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+
+    def set_budget(self, budget: float = None):
+        """设置对冲请求占请求总数的百分比上限"""
+        if budget is not None:
+            self.budget = min(max(float(budget), 0.0), 100.0) / 100
+
+    def delay(self) -> float | None:
+        if not self.budget or len(self.samples) < self.SAMPLES:
+            return None
+        samples = sorted(self.samples)
+        index = round((len(samples) - 1) * self.percentile / 100)
+        return max(samples[index], self.MIN_DELAY)
+
+    def __allow(self) -> bool:
+        if self.hedges + 1 <= self.budget * self.requests:
+            self.hedges += 1
+            return True
+        return False
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable],
+        secondary: Callable[[], Awaitable] = None,
+        discard: Callable[[Any], Awaitable] = None,
+    ) -> Any:
+        """执行请求；secondary 为空时使用 primary 发送对冲请求
+
+        请求应在收到响应时返回，记录的耗时为首个响应的等待时间；未使用的响应交给 discard 释放。
+        """
+        self.requests += 1
+        start = monotonic()
+        index, result = await race(
+            primary,
+            secondary or primary,
+            self.delay(),
+            self.__allow,
+            discard,
+        )
+        if index:
+            self.wins += 1
+        # 仅记录成功请求的耗时，对冲请求胜出时记录的耗时包含等待时间
+        self.samples.append(monotonic() - start)
+        return result
+
+    def status(self) -> dict:
+        return {
+            "budget": round(self.budget * 100, 2),
+            "delay": self.delay(),
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "wins": self.wins,
+        }
@@ -0,0 +1,69 @@
+from asyncio import sleep
+from collections import deque
+from datetime import datetime
+from time import monotonic
+
+__all__ = ["BandwidthLimiter"]
+
+
+class BandwidthLimiter:
+    """令牌桶限速器，所有下载任务共享同一个实例；速率单位：Mbit/s，0 表示不限速"""
+
+    NIGHT = (22, 7)
+    WINDOW = 5
+
+    def __init__(self, day: float = 0, night: float = 0):
+        self.day = 0.0
+        self.night = 0.0
+        self.set_limit(day, night)
+        self.tokens = 0.0
+        self.last = monotonic()
+        self.records = deque()
+
+    def set_limit(self, day: float = None, night: float = None):
+        if day is not None:
+            self.day = max(float(day), 0.0)
+        if night is not None:
+            self.night = max(float(night), 0.0)
+
+    def is_night(self) -> bool:
+        start, end = self.NIGHT
+        hour = datetime.now().hour
+        return hour >= start or hour < end
+
+    @property
+    def rate(self) -> float:
+        """当前时段的限速，单位：字节/秒"""
+        return (self.night if self.is_night() else self.day) * 1000 * 1000 / 8
+
+    async def acquire(self, size: int):
+        now = monotonic()
+        self.__record(now, size)
+        if not (rate := self.rate):
+            self.last = now
+            return
+        # 桶容量为一秒的流量，超出部分先记为欠账，按欠账时长等待
+        self.tokens = min(rate, self.tokens + (now - self.last) * rate) - size
+        self.last = now
+        if self.tokens < 0:
+            await sleep(-self.tokens / rate)
+
+    def __record(self, now: float, size: int):
+        self.records.append((now, size))
+        while self.records and now - self.records[0][0] > self.WINDOW:
+            self.records.popleft()
+
+    def throughput(self) -> float:
+        """最近一段时间的实际下载速度，单位：Mbit/s"""
+        now = monotonic()
+        while self.records and now - self.records[0][0] > self.WINDOW:
+            self.records.popleft()
+        return sum(i for _, i in self.records) * 8 / 1000 / 1000 / self.WINDOW
+
+    def status(self) -> dict:
+        return {
+            "day": self.day,
+            "night": self.night,
+            "night_period": self.is_night(),
+            "throughput": round(self.throughput(), 3),
+        }
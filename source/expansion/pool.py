@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+__all__ = ["BufferPool"]
+
+
+class BufferPool:
+    """所有写入器共享的缓冲区池；缓冲区按 2 的幂次分组复用，避免每次下载重新分配并清零内存"""
+
+    # 最小分组大小，较小的文件共用同一组缓冲区
+    MIN_SIZE = 64 * 1024
+    # 每组最多保留的空闲缓冲区数量
+    MAX_IDLE = 4
+    # 全部空闲缓冲区的总大小上限，空闲缓冲区不计入内存预算，单位：字节
+    MAX_IDLE_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, idle: int = MAX_IDLE, limit: int = MAX_IDLE_SIZE):
+        self.idle = idle
+        self.limit = limit
+        self.size = 0
+        self.buffers: defaultdict[int, list[bytearray]] = defaultdict(list)
+        self.allocated = 0
+        self.reused = 0
+
+    @classmethod
+    def bucket(cls, size: int) -> int:
+        return max(1 << (max(size, 1) - 1).bit_length(), cls.MIN_SIZE)
+
+    def acquire(self, size: int) -> bytearray:
+        """返回容量不小于 size 的缓冲区，缓冲区内容未清零"""
+        if buffers := self.buffers.get(self.bucket(size)):
+            self.reused += 1
+            self.size -= len(buffers[-1])
+            return buffers.pop()
+        self.allocated += 1
+        return bytearray(self.bucket(size))
+
+    def release(self, buffer: bytearray):
+        if (
+            len(buffers := self.buffers[len(buffer)]) < self.idle
+            and self.size + len(buffer) <= self.limit
+        ):
+            buffers.append(buffer)
+            self.size += len(buffer)
+
+    def status(self) -> dict:
+        return {
+            "allocated": self.allocated,
+            "reused": self.reused,
+            "idle": self.size,
+        }
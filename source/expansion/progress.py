@@ -0,0 +1,141 @@
+from time import monotonic
+
+from rich.table import Table
+
+__all__ = ["TransferProgress"]
+
+
+class TransferProgress:
+    """记录文件、作品、批次三个层级的下载进度；数据块循环中仅累加计数，界面按间隔读取快照"""
+
+    INTERVAL = 0.5
+    KEEP_WORKS = 100
+
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self.files: dict[str, dict] = {}
+        self.works: dict[str, dict] = {}
+        self.batch = self.__create_state(0)
+
+    @staticmethod
+    def __create_state(total: int | None, done: int = 0, work: str = None) -> dict:
+        return {
+            "total": total,
+            "done": done,
+            "start": monotonic(),
+            "offset": done,
+            "work": work,
+            "finished": False,
+        }
+
+    def reset(self):
+        self.files.clear()
+        self.works.clear()
+        self.batch = self.__create_state(0)
+
+    def start(
+        self,
+        name: str,
+        total: int | None,
+        completed: int = 0,
+        work: str = None,
+    ):
+        if previous := self.files.get(name):
+            self.__adjust(
+                previous["work"], -previous["done"], -(previous["total"] or 0)
+            )
+        self.files[name] = self.__create_state(total, completed, work)
+        if work not in self.works:
+            self.works[work] = self.__create_state(0, work=work)
+        self.works[work]["finished"] = False
+        self.__adjust(work, completed, total or 0)
+        # 断点续传已完成的部分不计入下载速度
+        self.works[work]["offset"] += completed
+        self.batch["offset"] += completed
+
+    def advance(self, name: str, size: int):
+        if not (state := self.files.get(name)):
+            return
+        state["done"] += size
+        self.works[state["work"]]["done"] += size
+        self.batch["done"] += size
+
+    def finish(self, name: str, success: bool = True):
+        if not (state := self.files.pop(name, None)):
+            return
+        if not success:
+            self.__adjust(state["work"], -state["done"], -(state["total"] or 0))
+        elif state["total"] is None:
+            self.__adjust(state["work"], 0, state["done"])
+        work = self.works[state["work"]]
+        work["finished"] = not any(
+            i["work"] == state["work"] for i in self.files.values()
+        )
+        self.__trim_works()
+
+    def __adjust(self, work: str, done: int, total: int):
+        for state in (self.works[work], self.batch):
+            state["done"] += done
+            state["total"] += total
+
+    def __trim_works(self):
+        finished = [k for k, v in self.works.items() if v["finished"]]
+        for key in finished[: max(len(self.works) - self.KEEP_WORKS, 0)]:
+            self.works.pop(key)
+
+    @staticmethod
+    def __summary(state: dict, now: float) -> dict:
+        elapsed = now - state["start"]
+        rate = (state["done"] - state["offset"]) / elapsed if elapsed > 0 else 0.0
+        total = state["total"] or None
+        return {
+            "done": state["done"],
+            "total": total,
+            "rate": rate,
+            "eta": (total - state["done"]) / rate if total and rate else None,
+        }
+
+    def snapshot(self) -> dict:
+        now = monotonic()
+        return {
+            "files": {k: self.__summary(v, now) for k, v in self.files.items()},
+            "works": {
+                k: self.__summary(v, now) | {"finished": v["finished"]}
+                for k, v in self.works.items()
+            },
+            "batch": self.__summary(self.batch, now),
+        }
+
+    @staticmethod
+    def __format_size(size: float | None) -> str:
+        if size is None:
+            return "-"
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024:
+                return f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} TB"
+
+    @staticmethod
+    def __format_time(seconds: float | None) -> str:
+        if seconds is None:
+            return "-"
+        minutes, seconds = divmod(int(seconds), 60)
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def render(self, snapshot: dict = None) -> Table:
+        snapshot = snapshot or self.snapshot()
+        table = Table(box=None, expand=True)
+        for column in ("", "Done", "Total", "Speed", "ETA"):
+            table.add_column(column, no_wrap=True)
+        rows = [(k, v) for k, v in snapshot["files"].items()]
+        rows.append(("Total", snapshot["batch"]))
+        for name, state in rows:
+            table.add_row(
+                name,
+                self.__format_size(state["done"]),
+                self.__format_size(state["total"]),
+                f"{self.__format_size(state['rate'])}/s",
+                self.__format_time(state["eta"]),
+            )
+        return table
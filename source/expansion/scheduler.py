@@ -0,0 +1,78 @@
+from asyncio import Future, get_running_loop
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from itertools import count
+from time import monotonic
+
+__all__ = ["Priority", "Scheduler"]
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class Scheduler:
+    """按优先级分配下载并发名额，同一优先级内优先执行较小的任务"""
+
+    # 等待时间每超过 AGING 秒，任务优先级提升一级，避免低优先级任务饿死
+    AGING = 30.0
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.active = 0
+        self.waiting: list[tuple[int, int, float, int, Future]] = []
+        self.sequence = count()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.NORMAL,
+        size: int = 0,
+    ):
+        if self.active < self.workers and not self.waiting:
+            self.active += 1
+        else:
+            future = get_running_loop().create_future()
+            self.waiting.append(
+                (priority, size, monotonic(), next(self.sequence), future)
+            )
+            try:
+                await future
+            except BaseException:
+                self.__cancel(future)
+                raise
+        try:
+            yield
+        finally:
+            self.__release()
+
+    def __key(self, item: tuple, now: float) -> tuple:
+        priority, size, enqueued, sequence, _ = item
+        return max(priority - int((now - enqueued) // self.AGING), 0), size, sequence
+
+    def __release(self):
+        self.active -= 1
+        while self.waiting and self.active < self.workers:
+            now = monotonic()
+            item = min(self.waiting, key=lambda i: self.__key(i, now))
+            self.waiting.remove(item)
+            if not (future := item[-1]).done():
+                self.active += 1
+                future.set_result(None)
+
+    def __cancel(self, future: Future):
+        for item in self.waiting:
+            if item[-1] is future:
+                self.waiting.remove(item)
+                return
+        # 名额已分配但任务被取消，需要释放该名额
+        if future.done() and not future.cancelled():
+            self.__release()
+
+    def status(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": {i.name: sum(j[0] == i for j in self.waiting) for i in Priority},
+        }
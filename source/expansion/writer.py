@@ -0,0 +1,153 @@
+import os
+from asyncio import Future, get_running_loop
+from collections import deque
+from concurrent.futures import Executor
+from pathlib import Path
+
+from .budget import MemoryBudget
+from .pool import BufferPool
+
+__all__ = ["ChunkWriter"]
+
+
+class ChunkWriter:
+    """单个文件的写入器；数据先复制至可复用的缓冲区，缓冲区写满后交由写入线程按偏移量写入文件
+
+    缓冲区大小不超过文件大小，写入完成后归还至共享的缓冲区池，供之后的下载任务复用。
+    """
+
+    # 每个文件最多同时存在的缓冲区数量，写入线程未完成时等待，限制内存占用
+    MAX_BUFFERS = 2
+    FLAGS = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+
+    def __init__(
+        self,
+        executor: Executor,
+        path: Path,
+        position: int = 0,
+        size: int = 1024 * 1024,
+        length: int = None,
+        budget: MemoryBudget = None,
+        pool: BufferPool = None,
+    ):
+        self.executor = executor
+        self.budget = budget
+        self.pool = pool
+        self.path = path
+        self.offset = position
+        # 剩余数据量小于数据块大小时，缓冲区只需容纳剩余数据
+        self.size = max(min(size, length - position), 1) if length else size
+        # 缓冲区池按分组大小分配，内存预算按实际分配的大小计算
+        self.capacity = pool.bucket(self.size) if pool else self.size
+        self.length = length
+        self.fd: int | None = None
+        self.buffers: deque[bytearray] = deque()
+        self.pending: deque[tuple[Future, bytearray]] = deque()
+        self.created = 0
+        self.buffer: bytearray | None = None
+        self.fill = 0
+
+    async def __aenter__(self):
+        self.fd = await self.__submit(self.__open)
+        self.buffer = await self.__next_buffer()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            # 下载中断时同样写入已接收的数据，便于断点续传
+            if not isinstance(exc_value, OSError):
+                await self.flush()
+            await self.__wait_pending()
+        finally:
+            await self.__submit(os.close, self.fd)
+            self.__release_buffers()
+            if self.budget:
+                self.budget.release(self.created * self.capacity)
+
+    def __open(self) -> int:
+        return os.open(self.path, self.FLAGS | (0 if self.offset else os.O_TRUNC))
+
+    def __release_buffers(self):
+        # 仍在写入的缓冲区不归还
+        if not self.pool:
+            return
+        if self.buffer is not None:
+            self.buffers.append(self.buffer)
+            self.buffer = None
+        while self.buffers:
+            self.pool.release(self.buffers.popleft())
+
+    @staticmethod
+    def __write(fd: int, data: memoryview, offset: int):
+        if hasattr(os, "pwrite"):
+            while data:
+                written = os.pwrite(fd, data, offset)
+                data, offset = data[written:], offset + written
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            while data:
+                data = data[os.write(fd, data) :]
+
+    def __submit(self, function, *args) -> Future:
+        return get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            count = min(len(view), self.size - self.fill)
+            self.buffer[self.fill : self.fill + count] = view[:count]
+            self.fill += count
+            view = view[count:]
+            if self.fill == self.size:
+                await self.flush()
+
+    async def flush(self):
+        if not self.fill:
+            return
+        self.pending.append(
+            (
+                self.__submit(
+                    self.__write,
+                    self.fd,
+                    memoryview(self.buffer)[: self.fill],
+                    self.offset,
+                ),
+                self.buffer,
+            )
+        )
+        self.offset += self.fill
+        self.fill = 0
+        self.buffer = await self.__next_buffer()
+
+    async def __next_buffer(self) -> bytearray:
+        if self.buffers:
+            return self.buffers.popleft()
+        if self.__allocate():
+            return self.pool.acquire(self.size) if self.pool else bytearray(self.size)
+        future, buffer = self.pending.popleft()
+        await future
+        return buffer
+
+    def __allocate(self) -> bool:
+        if self.created >= self.MAX_BUFFERS:
+            return False
+        if self.budget:
+            # 第一个缓冲区不等待预算，其余缓冲区仅在预算充足时分配，否则复用已有缓冲区
+            if not self.created:
+                self.budget.reserve(self.capacity)
+            elif not self.budget.try_acquire(self.capacity):
+                return False
+        self.created += 1
+        return True
+
+    async def __wait_pending(self):
+        error = None
+        while self.pending:
+            future, buffer = self.pending.popleft()
+            try:
+                await future
+            except OSError as e:
+                error = error or e
+            self.buffers.append(buffer)
+        if error:
+            raise error
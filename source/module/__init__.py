@@ -1,12 +1,18 @@
 from .extend import Account
 from .manager import Manager
 from .model import (
+    BandwidthParams,
     ExtractData,
     ExtractParams,
+    SearchData,
+    SearchParams,
 )
 from .recorder import DataRecorder
 from .recorder import IDRecorder
 from .recorder import MapRecorder
+from .recorder import FileRecorder
+from .recorder import BlobRecorder
+from .recorder import JournalRecorder
 from .mapping import Mapping
 from .settings import Settings
 from .static import (
@@ -26,6 +32,8 @@ from .static import (
     INFO,
     USERSCRIPT,
     HEADERS,
+    CDN_HOSTS,
+    CONNECTION_POOL,
     PROJECT,
     USERAGENT,
     FILE_SIGNATURES,
@@ -38,4 +46,6 @@ from .tools import (
     logging,
     sleep_time,
     retry_limited,
+    ThreadLog,
+    match_signature,
 )
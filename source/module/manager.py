@@ -1,20 +1,34 @@
+from asyncio import gather
+from contextlib import suppress
+from datetime import datetime
+from hashlib import sha1
+from importlib.util import find_spec
 from pathlib import Path
 from re import compile, sub
-from shutil import move, rmtree
-from os import utime
+from shutil import copy2, move, rmtree
+from os import link, replace, utime
 from httpx import (
     AsyncClient,
     AsyncHTTPTransport,
+    HTTPError,
     HTTPStatusError,
+    Limits,
     RequestError,
     TimeoutException,
     get,
 )
 
-from source.expansion import remove_empty_directories
+from source.expansion import (
+    BandwidthLimiter,
+    FileSystem,
+    HedgePolicy,
+    HostPool,
+    MemoryBudget,
+    remove_empty_directories,
+)
 
 from ..translation import _
-from .static import HEADERS, USERAGENT, WARNING
+from .static import CDN_HOSTS, CONNECTION_POOL, HEADERS, USERAGENT, WARNING
 from .tools import logging
 
 __all__ = ["Manager"]
@@ -37,11 +51,36 @@ class Manager:
         "作者昵称",
         "作者ID",
     )
+    POOL = CONNECTION_POOL
     NO_PROXY = {
         "http://": None,
         "https://": None,
     }
     SEPARATE = "_"
+    SHARDS = (
+        "author",
+        "month",
+    )
+    VIDEO_QUALITY = (
+        "origin",
+        "best",
+        "smallest",
+    )
+    VIDEO_CODECS = (
+        "h264",
+        "h265",
+        "av1",
+    )
+    LIVE_QUALITY = (
+        "h264",
+        "h265",
+        "best",
+        "smallest",
+    )
+    LIVE_MODES = (
+        "still",
+        "live",
+    )
     WEB_ID = r"(?:^|; )webId=[^;]+"
     WEB_SESSION = r"(?:^|; )web_session=[^;]+"
 
@@ -66,12 +105,30 @@ class Manager:
         folder_mode: bool,
         author_archive: bool,
         write_mtime: bool,
+        deduplicate: bool,
+        file_index: bool,
+        bandwidth_day: float,
+        bandwidth_night: float,
+        folder_shard: str,
+        memory_budget: float,
+        video_quality: str,
+        video_codec: str,
+        live_quality: str,
+        live_mode: str,
+        cdn_hosts: dict[str, list[str]],
+        cdn_hedge: float,
+        page_hedge: float,
+        hedge_proxy: str,
+        request_pool: dict,
+        download_pool: dict,
+        warm_up: bool,
         _print: bool,
     ):
         self.root = root
-        self.temp = root.joinpath("./temp")
         self.path = self.__check_path(path)
         self.folder = self.__check_folder(folder)
+        # 缓存文件夹位于下载文件夹内部，与目标文件处于同一文件系统，保存文件时仅需重命名
+        self.temp = self.__check_temp(self.folder)
         self.blank_headers = HEADERS | {
             "user-agent": user_agent or USERAGENT,
         }
@@ -84,41 +141,63 @@ class Manager:
         self.record_data = self.check_bool(record_data, False)
         self.image_format = self.__check_image_format(image_format)
         self.folder_mode = self.check_bool(folder_mode, False)
+        self.folder_shard = self.__check_folder_shard(folder_shard)
         self.download_record = self.check_bool(download_record, True)
+        self.video_quality = self.__check_video_quality(video_quality)
+        self.video_codec = self.__check_video_codec(video_codec)
         self.proxy_tip = None
         self.proxy = self.__check_proxy(proxy)
         self.print_proxy_tip(
             _print,
         )
         self.timeout = timeout
-        self.request_client = AsyncClient(
-            headers=self.headers
+        self.request_pool = self.__check_pool(request_pool, _print)
+        self.download_pool = self.__check_pool(download_pool, _print)
+        self.warm_up = self.check_bool(warm_up, True)
+        self.request_client = self.__create_client(
+            self.headers
             | {
                 "referer": "https://www.xiaohongshu.com/",
             },
-            timeout=timeout,
-            verify=False,
-            follow_redirects=True,
-            mounts={
-                "http://": AsyncHTTPTransport(proxy=self.proxy),
-                "https://": AsyncHTTPTransport(proxy=self.proxy),
-            },
+            self.proxy,
+            self.request_pool,
         )
-        self.download_client = AsyncClient(
-            headers=self.blank_headers,
-            timeout=timeout,
-            verify=False,
-            follow_redirects=True,
-            mounts={
-                "http://": AsyncHTTPTransport(proxy=self.proxy),
-                "https://": AsyncHTTPTransport(proxy=self.proxy),
-            },
+        self.hedge = HedgePolicy(page_hedge)
+        # 对冲请求通过其他代理发送，未设置时使用同一个客户端
+        self.hedge_client = (
+            self.__create_client(
+                self.headers
+                | {
+                    "referer": "https://www.xiaohongshu.com/",
+                },
+                hedge_proxy,
+                self.request_pool,
+            )
+            if hedge_proxy
+            else None
+        )
+        self.download_client = self.__create_client(
+            self.blank_headers,
+            self.proxy,
+            self.download_pool,
         )
         self.image_download = self.check_bool(image_download, True)
         self.video_download = self.check_bool(video_download, True)
         self.live_download = self.check_bool(live_download, True)
+        self.live_quality = self.__check_live_quality(live_quality)
+        self.live_mode = self.__check_live_mode(live_mode)
         self.author_archive = self.check_bool(author_archive, False)
         self.write_mtime = self.check_bool(write_mtime, False)
+        self.deduplicate = self.check_bool(deduplicate, False)
+        self.file_index = self.check_bool(file_index, True)
+        self.limiter = BandwidthLimiter(bandwidth_day, bandwidth_night)
+        self.budget = MemoryBudget(memory_budget)
+        self.filesystem = FileSystem()
+        self.hosts = HostPool(
+            CDN_HOSTS,
+            cdn_hosts if isinstance(cdn_hosts, dict) else {},
+            cdn_hedge,
+        )
 
     def __check_path(self, path: str) -> Path:
         if not path:
@@ -130,9 +209,59 @@ class Manager:
     def __check_folder(self, folder: str) -> Path:
         folder = self.path.joinpath(folder or "Download")
         folder.mkdir(exist_ok=True)
-        self.temp.mkdir(exist_ok=True)
         return folder
 
+    @staticmethod
+    def __check_temp(folder: Path) -> Path:
+        temp = folder.joinpath(".partial")
+        temp.mkdir(exist_ok=True)
+        return temp
+
+    @classmethod
+    def __check_pool(cls, pool: dict, _print: bool = True) -> dict:
+        pool = cls.POOL | (pool if isinstance(pool, dict) else {})
+        for key in ("max_connections", "max_keepalive_connections"):
+            if not isinstance(pool[key], int) or pool[key] <= 0:
+                pool[key] = cls.POOL[key]
+        if not isinstance(pool["keepalive_expiry"], int | float) or (
+            pool["keepalive_expiry"] < 0
+        ):
+            pool["keepalive_expiry"] = cls.POOL["keepalive_expiry"]
+        pool["http2"] = cls.check_bool(pool["http2"], False)
+        if pool["http2"] and not find_spec("h2"):
+            # HTTP/2 依赖可选模块 h2，未安装时使用 HTTP/1.1
+            pool["http2"] = False
+            if _print:
+                logging(None, _("未安装 h2 模块，无法启用 HTTP/2"), WARNING)
+        return pool
+
+    def __create_client(
+        self,
+        headers: dict,
+        proxy: str | None,
+        pool: dict,
+    ) -> AsyncClient:
+        # 设置 mounts 后客户端的连接池参数不会生效，需要为每个传输层单独设置
+        transport = {
+            "proxy": proxy,
+            "limits": Limits(
+                max_connections=pool["max_connections"],
+                max_keepalive_connections=pool["max_keepalive_connections"],
+                keepalive_expiry=pool["keepalive_expiry"],
+            ),
+            "http2": pool["http2"],
+        }
+        return AsyncClient(
+            headers=headers,
+            timeout=self.timeout,
+            verify=False,
+            follow_redirects=True,
+            mounts={
+                "http://": AsyncHTTPTransport(**transport),
+                "https://": AsyncHTTPTransport(**transport),
+            },
+        )
+
     @staticmethod
     def __check_root_again(root: Path) -> bool | Path:
         if root.resolve().parent.is_dir():
@@ -153,6 +282,45 @@ class Manager:
             return i
         return "png"
 
+    @classmethod
+    def __check_folder_shard(cls, folder_shard: str) -> str:
+        return i if (i := (folder_shard or "").lower()) in cls.SHARDS else ""
+
+    @classmethod
+    def __check_video_quality(cls, video_quality: str | int) -> str:
+        # 除预设策略外，支持设置视频分辨率上限，例如：1080、720
+        if (i := str(video_quality or "").lower()) in cls.VIDEO_QUALITY or (
+            i.isdigit() and int(i) > 0
+        ):
+            return i
+        return "origin"
+
+    @classmethod
+    def __check_video_codec(cls, video_codec: str) -> str:
+        return i if (i := (video_codec or "").lower()) in cls.VIDEO_CODECS else ""
+
+    @classmethod
+    def __check_live_quality(cls, live_quality: str) -> str:
+        return i if (i := (live_quality or "").lower()) in cls.LIVE_QUALITY else "h264"
+
+    @classmethod
+    def __check_live_mode(cls, live_mode: str) -> str:
+        return i if (i := (live_mode or "").lower()) in cls.LIVE_MODES else ""
+
+    def shard(
+        self,
+        author: str,
+        published: datetime | None,
+        layout: str = None,
+    ) -> str:
+        """返回作品所属的分片文件夹名称，未启用分片时返回空字符串"""
+        match layout or self.folder_shard:
+            case "author":
+                return sha1((author or "").encode()).hexdigest()[:2]
+            case "month":
+                return published.strftime("%Y-%m") if published else "0000-00"
+        return ""
+
     @staticmethod
     def is_exists(path: Path) -> bool:
         return path.exists()
@@ -174,7 +342,11 @@ class Manager:
         mtime: int = None,
         rewrite: bool = False,
     ):
-        move(temp.resolve(), path.resolve())
+        try:
+            replace(temp.resolve(), path.resolve())
+        except OSError:
+            # 跨文件系统无法直接重命名，退回为复制后删除
+            move(temp.resolve(), path.resolve())
         if rewrite and mtime:
             cls.update_mtime(path.resolve(), mtime)
 
@@ -182,6 +354,18 @@ class Manager:
     def update_mtime(file: Path, mtime: int):
         utime(file, (mtime, mtime))
 
+    @staticmethod
+    def link(source: Path, path: Path) -> bool:
+        """创建硬链接，返回是否与源文件共享同一个文件"""
+        path.unlink(missing_ok=True)
+        try:
+            link(source, path)
+            return True
+        except OSError:
+            # 文件系统不支持硬链接时，退回为复制文件
+            copy2(source, path)
+            return False
+
     def __clean(self):
         rmtree(self.temp.resolve())
 
@@ -196,9 +380,34 @@ class Manager:
     async def close(self):
         await self.request_client.aclose()
         await self.download_client.aclose()
+        if self.hedge_client:
+            await self.hedge_client.aclose()
         # self.__clean()
-        remove_empty_directories(self.root)
-        remove_empty_directories(self.folder)
+        await self.filesystem.clean()
+        self.filesystem.close()
+
+    async def preconnect(self):
+        """预先建立与作品页面及 CDN 域名的连接，连接保留在连接池中，首次请求无需等待握手"""
+        hosts = dict.fromkeys(j for i in self.hosts.groups.values() for j in i)
+        await gather(
+            self.__connect(self.request_client, "https://www.xiaohongshu.com/"),
+            *(
+                (self.__connect(self.hedge_client, "https://www.xiaohongshu.com/"),)
+                if self.hedge_client
+                else ()
+            ),
+            *(self.__connect(self.download_client, f"https://{i}/") for i in hosts),
+        )
+
+    @staticmethod
+    async def __connect(client: AsyncClient, url: str):
+        with suppress(HTTPError):
+            await client.head(url)
+
+    async def remove_empty_directories(self):
+        """遍历程序文件夹与下载文件夹，删除全部空文件夹，文件数量较多时耗时较长"""
+        await self.filesystem.run(remove_empty_directories, self.root)
+        await self.filesystem.run(remove_empty_directories, self.folder)
 
     def __check_name_format(self, format_: str) -> str:
         keys = format_.split()
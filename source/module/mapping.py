@@ -1,9 +1,12 @@
+from asyncio import Task, create_task, current_task, get_running_loop, to_thread
+from json import dumps, loads
+from os import fsync, scandir
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from ..translation import _
 from .static import ERROR
-from .tools import logging
+from .tools import ThreadLog, logging
 
 if TYPE_CHECKING:
     from manager import Manager
@@ -14,6 +17,8 @@ __all__ = ["Mapping"]
 
 
 class Mapping:
+    PROGRESS_STEP = 500
+
     def __init__(
         self,
         manager: "Manager",
@@ -21,8 +26,14 @@ class Mapping:
     ):
         self.root = manager.folder
         self.folder_mode = manager.folder_mode
+        self.folder_shard = manager.folder_shard
+        self.shard = manager.shard
         self.database = mapping
         self.switch = manager.author_archive
+        self.cache: dict[str, str] | None = None
+        self.tasks: dict[str, Task] = {}
+        self.progress: dict[str, tuple[int, int]] = {}
+        self.journal = manager.root.joinpath("MappingJournal")
 
     async def update_cache(
         self,
@@ -32,167 +43,305 @@ class Mapping:
     ):
         if not self.switch:
             return
-        if (a := await self.has_mapping(id_)) and a != alias:
-            self.__check_file(
+        if self.cache is None:
+            self.cache = await self.database.all() or {}
+        if (a := self.cache.get(id_)) == alias:
+            return
+        if a:
+            self.__queue_rename(
                 id_,
                 alias,
                 a,
                 log,
             )
+        self.cache[id_] = alias
         await self.database.add(id_, alias)
 
     async def has_mapping(self, id_: str) -> str:
+        if self.cache is not None:
+            return self.cache.get(id_, "")
         return d[0] if (d := await self.database.select(id_)) else ""
 
-    def __check_file(
+    def __queue_rename(
         self,
         id_: str,
         alias: str,
         old_alias: str,
         log,
     ):
-        if not (old_folder := self.root.joinpath(f"{id_}_{old_alias}")).is_dir():
-            logging(
+        self.tasks[id_] = create_task(
+            self.__rename_task(
+                self.tasks.get(id_),
+                id_,
+                alias,
+                old_alias,
                 log,
-                _("{old_folder} 文件夹不存在，跳过处理").format(
-                    old_folder=old_folder.name
-                ),
             )
-            return
-        self.__rename_folder(
-            old_folder,
-            id_,
-            alias,
-            log,
         )
-        self.__scan_file(
+
+    async def __rename_task(
+        self,
+        previous: Task | None,
+        id_: str,
+        alias: str,
+        old_alias: str,
+        log,
+    ):
+        if previous:
+            await previous
+        await to_thread(
+            self.__check_file,
             id_,
             alias,
             old_alias,
-            log,
+            ThreadLog(log, get_running_loop()) if log else None,
         )
+        self.__finish_task(id_)
+
+    def __finish_task(self, id_: str):
+        if self.tasks.get(id_) is current_task():
+            self.tasks.pop(id_)
+            self.progress.pop(id_, None)
+
+    async def wait(self, id_: str):
+        """等待指定作者的重命名任务完成，避免下载文件写入旧文件夹"""
+        if task := self.tasks.get(id_):
+            await task
+
+    async def close(self):
+        for task in list(self.tasks.values()):
+            await task
+        self.tasks.clear()
 
-    def __rename_folder(
+    def recover(self, log=None):
+        """继续处理上次运行中断时遗留的重命名日志"""
+        if not self.journal.is_dir():
+            return
+        for file in self.journal.glob("*.json"):
+            self.tasks[file.stem] = create_task(
+                self.__recover_task(
+                    self.tasks.get(file.stem),
+                    file,
+                    log,
+                )
+            )
+
+    async def __recover_task(
         self,
-        old_folder: Path,
-        id_: str,
-        alias: str,
+        previous: Task | None,
+        file: Path,
         log,
     ):
-        new_folder = self.root.joinpath(f"{id_}_{alias}")
-        self.__rename(
-            old_folder,
-            new_folder,
-            _("文件夹"),
-            log,
+        if previous:
+            await previous
+        await to_thread(
+            self.__recover,
+            file,
+            ThreadLog(log, get_running_loop()) if log else None,
         )
+        self.__finish_task(file.stem)
+
+    def __recover(self, file: Path, log):
+        header, done = self.__read_journal(file)
+        if not header:
+            file.unlink()
+            return
         logging(
             log,
-            _("文件夹 {old_folder} 已重命名为 {new_folder}").format(
-                old_folder=old_folder.name, new_folder=new_folder.name
-            ),
+            _("发现未完成的作者 {0} 重命名任务，正在继续处理").format(header["id"]),
+        )
+        self.__execute(
+            header["id"],
+            header["operations"],
+            done,
+            file,
+            log,
         )
 
-    def __rename_works_folder(
+    def __check_file(
         self,
-        old_: Path,
+        id_: str,
         alias: str,
         old_alias: str,
         log,
-    ) -> Path:
-        if old_alias in old_.name:
-            new_ = old_.parent / old_.name.replace(old_alias, alias, 1)
-            self.__rename(
-                old_,
-                new_,
-                _("文件夹"),
-                log,
-            )
+    ):
+        operations = []
+        for root in self.__author_roots(id_):
+            if (old_folder := root.joinpath(f"{id_}_{old_alias}")).is_dir():
+                operations.extend(
+                    self.__plan(
+                        old_folder,
+                        root.joinpath(f"{id_}_{alias}"),
+                        alias,
+                        old_alias,
+                    )
+                )
+        if not operations:
             logging(
                 log,
-                _("文件夹 {old_} 重命名为 {new_}").format(
-                    old_=old_.name, new_=new_.name
+                _("{old_folder} 文件夹不存在，跳过处理").format(
+                    old_folder=f"{id_}_{old_alias}"
                 ),
             )
-            return new_
-        return old_
+            return
+        file = self.__write_journal(id_, alias, old_alias, operations)
+        self.__execute(
+            id_,
+            operations,
+            set(),
+            file,
+            log,
+        )
+
+    def __author_roots(self, id_: str) -> list[Path]:
+        # 按月份分片时，同一作者的文件夹分布在多个月份文件夹中
+        match self.folder_shard:
+            case "author":
+                return [self.root.joinpath(self.shard(id_, None))]
+            case "month":
+                with scandir(self.root) as items:
+                    return [
+                        Path(i.path)
+                        for i in items
+                        if i.is_dir() and not i.name.startswith(".")
+                    ]
+        return [self.root]
 
-    def __scan_file(
+    def __plan(
         self,
-        id_: str,
+        old_folder: Path,
+        new_folder: Path,
         alias: str,
         old_alias: str,
-        log,
-    ):
-        root = self.root.joinpath(f"{id_}_{alias}")
-        item_list = root.iterdir()
-        if self.folder_mode:
-            for f in item_list:
-                if f.is_dir():
-                    f = self.__rename_works_folder(
-                        f,
-                        alias,
-                        old_alias,
-                        log,
+    ) -> list[tuple[str, str, bool]]:
+        # 预先生成全部重命名步骤，路径均为执行该步骤时的实际路径
+        operations = [(str(old_folder), str(new_folder), True)]
+        with scandir(old_folder) as items:
+            for item in items:
+                if not self.folder_mode:
+                    if old_alias in item.name:
+                        operations.append(
+                            self.__operation(
+                                new_folder, item.name, alias, old_alias, item.is_dir()
+                            )
+                        )
+                    continue
+                if not item.is_dir():
+                    continue
+                works = new_folder.joinpath(item.name)
+                if old_alias in item.name:
+                    operations.append(
+                        self.__operation(new_folder, item.name, alias, old_alias, True)
                     )
-                    files = f.iterdir()
-                    self.__batch_rename(
-                        f,
-                        files,
-                        alias,
-                        old_alias,
-                        log,
+                    works = Path(operations[-1][1])
+                with scandir(item.path) as files:
+                    operations.extend(
+                        self.__operation(works, f.name, alias, old_alias, False)
+                        for f in files
+                        if old_alias in f.name
                     )
-        else:
-            self.__batch_rename(
-                root,
-                item_list,
-                alias,
-                old_alias,
-                log,
-            )
+        return operations
 
-    def __batch_rename(
-        self,
+    @staticmethod
+    def __operation(
         root: Path,
-        files,
+        name: str,
         alias: str,
         old_alias: str,
+        folder: bool,
+    ) -> tuple[str, str, bool]:
+        return (
+            str(root.joinpath(name)),
+            str(root.joinpath(name.replace(old_alias, alias, 1))),
+            folder,
+        )
+
+    def __execute(
+        self,
+        id_: str,
+        operations: list,
+        done: set[int],
+        file: Path,
         log,
-    ):
-        for old_file in files:
-            if old_alias not in old_file.name:
-                break
-            self.__rename_file(
-                root,
-                old_file,
-                alias,
-                old_alias,
+    ) -> bool:
+        total = len(operations)
+        with file.open("a", encoding="utf-8") as journal:
+            for index, (old_, new_, folder) in enumerate(operations):
+                if index in done:
+                    continue
+                old_, new_ = Path(old_), Path(new_)
+                if old_.exists() or not new_.exists():
+                    if not self.__rename(
+                        old_,
+                        new_,
+                        _("文件夹") if folder else _("文件"),
+                        log,
+                    ):
+                        # 后续步骤依赖当前步骤的结果，保留日志，下次运行时继续处理
+                        logging(
+                            log,
+                            _("作者 {0} 重命名任务中断，将在下次运行时继续处理").format(
+                                id_
+                            ),
+                            ERROR,
+                        )
+                        return False
+                    if folder:
+                        logging(
+                            log,
+                            _("文件夹 {old_} 重命名为 {new_}").format(
+                                old_=old_.name, new_=new_.name
+                            ),
+                        )
+                journal.write(f"{index}\n")
+                journal.flush()
+                self.__update_progress(id_, index + 1, total, log)
+        file.unlink()
+        return True
+
+    def __update_progress(self, id_: str, current: int, total: int, log):
+        self.progress[id_] = (current, total)
+        if current == total or not current % self.PROGRESS_STEP:
+            logging(
                 log,
+                _("作者 {0} 文件重命名进度：{1}/{2}").format(id_, current, total),
             )
 
-    def __rename_file(
+    def __write_journal(
         self,
-        root: Path,
-        old_file: Path,
+        id_: str,
         alias: str,
         old_alias: str,
-        log,
-    ):
-        new_file = root.joinpath(old_file.name.replace(old_alias, alias, 1))
-        self.__rename(
-            old_file,
-            new_file,
-            _("文件"),
-            log,
-        )
-        logging(
-            log,
-            _("文件 {old_file} 重命名为 {new_file}").format(
-                old_file=old_file.name, new_file=new_file.name
-            ),
-        )
-        return True
+        operations: list,
+    ) -> Path:
+        self.journal.mkdir(exist_ok=True)
+        file = self.journal.joinpath(f"{id_}.json")
+        with file.open("w", encoding="utf-8") as f:
+            f.write(
+                dumps(
+                    {
+                        "id": id_,
+                        "alias": alias,
+                        "old_alias": old_alias,
+                        "operations": operations,
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+            f.flush()
+            fsync(f.fileno())
+        return file
+
+    @staticmethod
+    def __read_journal(file: Path) -> tuple[dict, set[int]]:
+        try:
+            with file.open("r", encoding="utf-8") as f:
+                header = loads(f.readline())
+                done = {int(i) for i in f if i.strip().isdigit()}
+            return header, done
+        except ValueError:
+            return {}, set()
 
     @staticmethod
     def __rename(
@@ -230,4 +379,4 @@ class Mapping:
                 ),
                 ERROR,
             )
-            return True
+            return False
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from ..expansion import Priority
+
 
 class ExtractParams(BaseModel):
     url: str
@@ -8,9 +10,29 @@ class ExtractParams(BaseModel):
     cookie: str = None
     proxy: str = None
     skip: bool = False
+    priority: Priority = Priority.INTERACTIVE
+    request_id: str = None
 
 
 class ExtractData(BaseModel):
     message: str
     params: ExtractParams
     data: dict | None
+
+
+class SearchParams(BaseModel):
+    keyword: str
+    page: int = 1
+    size: int = 20
+
+
+class BandwidthParams(BaseModel):
+    day: float = None
+    night: float = None
+
+
+class SearchData(BaseModel):
+    message: str
+    params: SearchParams
+    total: int
+    data: list[dict]
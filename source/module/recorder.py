@@ -1,5 +1,11 @@
-from asyncio import CancelledError
+from asyncio import CancelledError, to_thread
 from contextlib import suppress
+from os import scandir
+from pathlib import Path
+from re import compile
+from sqlite3 import OperationalError
+from time import time
+from urllib.parse import urlparse
 from typing import TYPE_CHECKING
 
 from aiosqlite import connect
@@ -7,7 +13,14 @@ from aiosqlite import connect
 if TYPE_CHECKING:
     from ..module import Manager
 
-__all__ = ["IDRecorder", "DataRecorder", "MapRecorder"]
+__all__ = [
+    "IDRecorder",
+    "DataRecorder",
+    "MapRecorder",
+    "FileRecorder",
+    "BlobRecorder",
+    "JournalRecorder",
+]
 
 
 class IDRecorder:
@@ -53,7 +66,7 @@ class IDRecorder:
     async def all(self):
         if self.switch:
             await self.cursor.execute("SELECT ID FROM explore_id")
-            return [i[0] for i in await self.cursor.fetchmany()]
+            return [i[0] for i in await self.cursor.fetchall()]
 
     async def __aenter__(self):
         await self._connect_database()
@@ -86,11 +99,45 @@ class DataRecorder(IDRecorder):
         ("下载地址", "TEXT"),
         ("动图地址", "TEXT"),
     )
+    METRICS = (
+        "收藏数量",
+        "评论数量",
+        "分享数量",
+        "点赞数量",
+    )
+    ROLLUP = (
+        "首次",
+        "最新",
+        "最小",
+        "最大",
+        "增长率",
+    )
+    UNITS = {
+        "千": 1000,
+        "万": 10000,
+        "亿": 100000000,
+    }
+    SEARCH_FIELDS = (
+        "作品标题",
+        "作品描述",
+        "作品标签",
+    )
+    SEARCH_TRIGGERS = (
+        "explore_search_insert",
+        "explore_search_delete",
+        "explore_search_update",
+    )
+    # trigram 分词器按 3 个字符建立索引，较短的关键词需要回退至 LIKE 匹配
+    TRIGRAM = 3
+    # 搜索结果每页数量上限
+    PAGE_SIZE = 100
 
     def __init__(self, manager: "Manager"):
         super().__init__(manager)
         self.file = manager.folder.joinpath("ExploreData.db")
         self.switch = manager.record_data
+        # 全文索引是否可用，SQLite 不支持 FTS5 或 trigram 分词器时使用 LIKE 匹配
+        self.fts = False
 
     async def _connect_database(self):
         self.database = await connect(self.file)
@@ -98,10 +145,84 @@ class DataRecorder(IDRecorder):
         await self.database.execute(f"""CREATE TABLE IF NOT EXISTS explore_data (
         {",".join(" ".join(i) for i in self.DATA_TABLE)}
         );""")
+        # 互动数据快照仅追加，数值为相对上一次快照的增量，未变化时存储为 0，几乎不占用空间
+        await self.database.execute(f"""CREATE TABLE IF NOT EXISTS explore_snapshot (
+        作品ID TEXT NOT NULL,
+        采集时间 INTEGER NOT NULL,
+        {",".join(f"{i} INTEGER" for i in self.METRICS)},
+        PRIMARY KEY (作品ID, 采集时间)
+        ) WITHOUT ROWID;""")
+        await self.database.execute(f"""CREATE TABLE IF NOT EXISTS explore_rollup (
+        作品ID TEXT PRIMARY KEY,
+        首次采集 INTEGER,
+        最近采集 INTEGER,
+        采集次数 INTEGER,
+        {",".join(self.__rollup_columns())}
+        );""")
+        # 包含 xsec_token 参数的访问链接，仅用于校验修复时重新提取作品数据
+        await self.database.execute("""CREATE TABLE IF NOT EXISTS explore_link (
+        作品ID TEXT PRIMARY KEY,
+        访问链接 TEXT
+        );""")
+        if self.switch:
+            self.fts = await self.__create_search_index()
         await self.database.commit()
 
-    async def select(self, id_: str):
-        pass
+    async def __create_search_index(self) -> bool:
+        try:
+            await self.__create_search_table()
+        except OperationalError:
+            # trigram 分词器需要 SQLite 3.34 及以上版本，且启用 FTS5 扩展
+            for i in self.SEARCH_TRIGGERS:
+                with suppress(OperationalError):
+                    await self.database.execute(f"DROP TRIGGER IF EXISTS {i};")
+            return False
+        return True
+
+    async def __create_search_table(self) -> None:
+        # 使用外部内容表，索引不重复存储文本；REPLACE 需要开启递归触发器才会触发删除
+        await self.database.execute("PRAGMA recursive_triggers = ON;")
+        # 未启用记录作品数据或 SQLite 不支持全文索引时不会创建触发器，索引可能已过期，需要重建
+        await self.cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN "
+            f"({', '.join('?' for _ in self.SEARCH_TRIGGERS)})",
+            self.SEARCH_TRIGGERS,
+        )
+        exists = (await self.cursor.fetchone())[0] == len(self.SEARCH_TRIGGERS)
+        fields = ", ".join(self.SEARCH_FIELDS)
+        new = ", ".join(f"new.{i}" for i in self.SEARCH_FIELDS)
+        old = ", ".join(f"old.{i}" for i in self.SEARCH_FIELDS)
+        await self.database.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS explore_search
+        USING fts5({fields}, content='explore_data', tokenize='trigram');""")
+        await self.database.execute(f"""CREATE TRIGGER IF NOT EXISTS explore_search_insert
+        AFTER INSERT ON explore_data BEGIN
+        INSERT INTO explore_search (rowid, {fields}) VALUES (new.rowid, {new});
+        END;""")
+        await self.database.execute(f"""CREATE TRIGGER IF NOT EXISTS explore_search_delete
+        AFTER DELETE ON explore_data BEGIN
+        INSERT INTO explore_search (explore_search, rowid, {fields})
+        VALUES ('delete', old.rowid, {old});
+        END;""")
+        await self.database.execute(f"""CREATE TRIGGER IF NOT EXISTS explore_search_update
+        AFTER UPDATE ON explore_data BEGIN
+        INSERT INTO explore_search (explore_search, rowid, {fields})
+        VALUES ('delete', old.rowid, {old});
+        INSERT INTO explore_search (rowid, {fields}) VALUES (new.rowid, {new});
+        END;""")
+        if not exists:
+            await self.database.execute(
+                "INSERT INTO explore_search (explore_search) VALUES ('rebuild');"
+            )
+
+    async def select(self, id_: str) -> dict | None:
+        if self.switch:
+            await self.cursor.execute(
+                f"SELECT {', '.join(i for i, _ in self.DATA_TABLE)} "
+                "FROM explore_data WHERE 作品ID=?",
+                (id_,),
+            )
+            if row := await self.cursor.fetchone():
+                return dict(zip((i for i, _ in self.DATA_TABLE), row))
 
     async def add(self, **kwargs) -> None:
         if self.switch:
@@ -109,20 +230,201 @@ class DataRecorder(IDRecorder):
                 f"""REPLACE INTO explore_data (
         {", ".join(i[0] for i in self.DATA_TABLE)}
         ) VALUES (
-        {", ".join("?" for _ in kwargs)}
+        {", ".join("?" for _ in self.DATA_TABLE)}
         );""",
                 self.__generate_values(kwargs),
             )
+            await self.__add_snapshot(kwargs)
             await self.database.commit()
 
+    async def __add_snapshot(self, data: dict) -> None:
+        id_ = data["作品ID"]
+        now = int(time())
+        metrics = [self.parse_count(data[i]) for i in self.METRICS]
+        rollup = await self.rollup(id_)
+        if rollup and now <= rollup["最近采集"]:
+            now = rollup["最近采集"] + 1
+        # 无法解析的数值存储为 NULL，增量相对于上一次有效的数值
+        delta = [
+            None if m is None else m - ((rollup or {}).get(f"{i}_最新") or 0)
+            for i, m in zip(self.METRICS, metrics)
+        ]
+        await self.database.execute(
+            f"""INSERT INTO explore_snapshot VALUES (
+        {", ".join("?" for _ in range(len(self.METRICS) + 2))}
+        );""",
+            (id_, now, *delta),
+        )
+        await self.database.execute(
+            f"""REPLACE INTO explore_rollup VALUES (
+        {", ".join("?" for _ in range(len(self.METRICS) * len(self.ROLLUP) + 4))}
+        );""",
+            self.__generate_rollup(id_, now, metrics, rollup),
+        )
+
+    def __generate_rollup(
+        self,
+        id_: str,
+        now: int,
+        metrics: list[int | None],
+        rollup: dict | None,
+    ) -> tuple:
+        first_time = rollup["首次采集"] if rollup else now
+        days = (now - first_time) / 86400
+        values = [
+            id_,
+            first_time,
+            now,
+            rollup["采集次数"] + 1 if rollup else 1,
+        ]
+        for key, value in zip(self.METRICS, metrics):
+            previous = [rollup[f"{key}_{i}"] if rollup else None for i in self.ROLLUP]
+            if value is None:
+                # 本次数值无效时保留原有统计数据
+                values.extend(previous)
+                continue
+            first = value if previous[0] is None else previous[0]
+            values.extend(
+                (
+                    first,
+                    value,
+                    value if previous[2] is None else min(previous[2], value),
+                    value if previous[3] is None else max(previous[3], value),
+                    (value - first) / days if days else 0.0,
+                )
+            )
+        return tuple(values)
+
+    async def select_link(self, id_: str) -> str | None:
+        if self.switch:
+            await self.cursor.execute(
+                "SELECT 访问链接 FROM explore_link WHERE 作品ID=?", (id_,)
+            )
+            if row := await self.cursor.fetchone():
+                return row[0]
+
+    async def add_link(self, id_: str, url: str) -> None:
+        if self.switch:
+            await self.database.execute(
+                "REPLACE INTO explore_link VALUES (?, ?);", (id_, url)
+            )
+            await self.database.commit()
+
+    async def rollup(self, id_: str) -> dict | None:
+        if self.switch:
+            await self.cursor.execute(
+                "SELECT * FROM explore_rollup WHERE 作品ID=?", (id_,)
+            )
+            if row := await self.cursor.fetchone():
+                return dict(zip((i[0] for i in self.cursor.description), row))
+
+    async def history(self, id_: str) -> list[dict]:
+        if self.switch:
+            await self.cursor.execute(
+                f"SELECT 采集时间, {', '.join(self.METRICS)} FROM explore_snapshot "
+                "WHERE 作品ID=? ORDER BY 采集时间",
+                (id_,),
+            )
+            result = []
+            values = [0] * len(self.METRICS)
+            for time_, *delta in await self.cursor.fetchall():
+                values = [i if j is None else i + j for i, j in zip(values, delta)]
+                result.append(
+                    {"采集时间": time_}
+                    | {
+                        k: None if j is None else i
+                        for k, i, j in zip(self.METRICS, values, delta)
+                    }
+                )
+            return result
+
+    async def search(
+        self,
+        keyword: str,
+        page: int = 1,
+        size: int = 20,
+    ) -> tuple[int, list[dict]]:
+        if not self.switch:
+            return 0, []
+        where, params, rank = self.__generate_search(keyword)
+        if not where:
+            return 0, []
+        page, size = self.paginate(page, size)
+        table = (
+            "explore_search JOIN explore_data "
+            "ON explore_data.rowid = explore_search.rowid"
+            if self.fts
+            else "explore_data"
+        )
+        await self.cursor.execute(f"SELECT COUNT(*) FROM {table} {where}", params)
+        total = (await self.cursor.fetchone())[0]
+        await self.cursor.execute(
+            f"SELECT explore_data.* FROM {table} {where} "
+            f"ORDER BY {rank} LIMIT ? OFFSET ?",
+            (*params, size, (page - 1) * size),
+        )
+        keys = [i[0] for i in self.cursor.description]
+        return total, [dict(zip(keys, i)) for i in await self.cursor.fetchall()]
+
+    @classmethod
+    def paginate(cls, page: int, size: int) -> tuple[int, int]:
+        """限制页码不小于 1，每页数量范围为 1 至 PAGE_SIZE"""
+        return max(int(page), 1), min(max(int(size), 1), cls.PAGE_SIZE)
+
+    def __generate_search(self, keyword: str) -> tuple[str, list, str]:
+        match_, like, params = [], [], []
+        table = "explore_search" if self.fts else "explore_data"
+        condition = " OR ".join(f"{table}.{i} LIKE ?" for i in self.SEARCH_FIELDS)
+        for word in keyword.split():
+            if self.fts and len(word) >= self.TRIGRAM:
+                match_.append(f'"{word.replace('"', '""')}"')
+            else:
+                like.append(f"({condition})")
+                params.extend([f"%{word}%"] * len(self.SEARCH_FIELDS))
+        if match_:
+            like.insert(0, "explore_search MATCH ?")
+            params.insert(0, " AND ".join(match_))
+            rank = "explore_search.rank"
+        else:
+            rank = "explore_data.采集时间 DESC"
+        return (f"WHERE {' AND '.join(like)}" if like else ""), params, rank
+
+    def __rollup_columns(self) -> list[str]:
+        return [
+            f"{i}_{j} {'REAL' if j == '增长率' else 'INTEGER'}"
+            for i in self.METRICS
+            for j in self.ROLLUP
+        ]
+
+    @classmethod
+    def parse_count(cls, value: str | int) -> int | None:
+        """解析互动数量，无法解析或缺少数据（-1）时返回 None"""
+        value = str(value).strip().rstrip("+")
+        try:
+            if value and (unit := cls.UNITS.get(value[-1])):
+                count = int(float(value[:-1]) * unit)
+            else:
+                count = int(float(value))
+        except ValueError:
+            return None
+        return count if count >= 0 else None
+
     async def __delete(self, id_: str) -> None:
         pass
 
     async def delete(self, ids: list | tuple):
         pass
 
-    async def all(self):
-        pass
+    async def all(self) -> list[dict]:
+        if self.switch:
+            await self.cursor.execute(
+                f"SELECT {', '.join(i for i, _ in self.DATA_TABLE)} FROM explore_data"
+            )
+            return [
+                dict(zip((i for i, _ in self.DATA_TABLE), row))
+                for row in await self.cursor.fetchall()
+            ]
+        return []
 
     def __generate_values(self, data: dict) -> tuple:
         return tuple(data[i] for i, _ in self.DATA_TABLE)
@@ -169,7 +471,321 @@ class MapRecorder(IDRecorder):
     async def delete(self, ids: list[str]):
         pass
 
-    async def all(self):
+    async def all(self) -> dict[str, str]:
         if self.switch:
             await self.cursor.execute("SELECT ID, NAME FROM mapping_data")
-            return [i[0] for i in await self.cursor.fetchmany()]
+            return dict(await self.cursor.fetchall())
+
+
+class FileRecorder(IDRecorder):
+    NUMBER = compile(r"_(\d+)$")
+    # 新增记录累计达到该数量时提交一次事务
+    BATCH = 100
+
+    def __init__(self, manager: "Manager"):
+        super().__init__(manager)
+        self.file = manager.folder.joinpath("FileIndex.db")
+        self.root = manager.folder
+        self.switch = manager.file_index
+        self.pending = 0
+
+    async def _connect_database(self):
+        self.database = await connect(self.file)
+        self.cursor = await self.database.cursor()
+        await self.database.execute(
+            "CREATE TABLE IF NOT EXISTS file_index ("
+            "PATH TEXT PRIMARY KEY,"
+            "ID TEXT,"
+            "NUMBER INTEGER,"
+            "SIZE INTEGER,"
+            "FORMAT TEXT"
+            ");"
+        )
+        await self.database.execute(
+            "CREATE INDEX IF NOT EXISTS file_index_id ON file_index (ID);"
+        )
+        await self.database.commit()
+
+    async def select(self, id_: str) -> list[tuple]:
+        if self.switch:
+            await self.cursor.execute(
+                "SELECT PATH, NUMBER, SIZE, FORMAT FROM file_index WHERE ID=?",
+                (id_,),
+            )
+            return await self.cursor.fetchall()
+        return []
+
+    async def add(
+        self,
+        path: Path,
+        id_: str = None,
+        number: int = None,
+        size: int = 0,
+        *args,
+        **kwargs,
+    ) -> None:
+        if not self.switch:
+            return
+        await self.database.execute(
+            "REPLACE INTO file_index VALUES (?, ?, ?, ?, ?);",
+            (
+                str(path),
+                id_,
+                number,
+                size,
+                path.suffix.lstrip("."),
+            ),
+        )
+        self.pending += 1
+        if self.pending >= self.BATCH:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """提交尚未提交的记录"""
+        self.pending = 0
+        await self.database.commit()
+
+    async def delete(self, paths: list[Path]):
+        if self.switch:
+            await self.database.executemany(
+                "DELETE FROM file_index WHERE PATH=?", [(str(i),) for i in paths]
+            )
+            await self.flush()
+
+    async def rename(self, paths: list[tuple[Path, Path]]):
+        if self.switch:
+            await self.database.executemany(
+                "UPDATE file_index SET PATH=? WHERE PATH=?",
+                [(str(new), str(old)) for old, new in paths],
+            )
+            await self.flush()
+
+    async def update_id(self, ids: dict[str, str]):
+        """补充索引中缺少的作品 ID，键为文件路径"""
+        if self.switch:
+            await self.database.executemany(
+                "UPDATE file_index SET ID=? WHERE PATH=?",
+                [(id_, path) for path, id_ in ids.items()],
+            )
+            await self.flush()
+
+    async def all(self) -> list[tuple]:
+        if self.switch:
+            await self.cursor.execute(
+                "SELECT PATH, ID, NUMBER, SIZE, FORMAT FROM file_index"
+            )
+            return await self.cursor.fetchall()
+        return []
+
+    async def rebuild(self) -> int:
+        """扫描一次下载文件夹重建文件索引，已记录的作品 ID 会被保留"""
+        if not self.switch:
+            return 0
+        files = await to_thread(self.__scan, self.root)
+        await self.database.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS file_scan (PATH TEXT PRIMARY KEY);"
+        )
+        await self.database.execute("DELETE FROM file_scan;")
+        await self.database.executemany(
+            "INSERT INTO file_scan VALUES (?);", [(i[0],) for i in files]
+        )
+        await self.database.execute(
+            "DELETE FROM file_index WHERE PATH NOT IN (SELECT PATH FROM file_scan);"
+        )
+        await self.database.executemany(
+            "INSERT INTO file_index VALUES (?, NULL, ?, ?, ?) "
+            "ON CONFLICT (PATH) DO UPDATE SET "
+            "SIZE=excluded.SIZE, FORMAT=excluded.FORMAT;",
+            files,
+        )
+        await self.flush()
+        return len(files)
+
+    @classmethod
+    def __scan(cls, root: Path) -> list[tuple]:
+        files = []
+        folders = [root]
+        while folders:
+            with scandir(folders.pop()) as items:
+                for item in items:
+                    if item.name.startswith("."):
+                        continue
+                    if item.is_dir(follow_symlinks=False):
+                        folders.append(item.path)
+                    elif (path := Path(item.path)).suffix not in {"", ".db"}:
+                        files.append(
+                            (
+                                item.path,
+                                int(n.group(1))
+                                if (n := cls.NUMBER.search(path.stem))
+                                else None,
+                                item.stat().st_size,
+                                path.suffix.lstrip("."),
+                            )
+                        )
+        return files
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.flush()
+        await super().__aexit__(exc_type, exc_value, traceback)
+
+
+class BlobRecorder(IDRecorder):
+    def __init__(self, manager: "Manager"):
+        super().__init__(manager)
+        self.file = manager.folder.joinpath("BlobStore.db")
+        self.root = manager.folder.joinpath(".blobs")
+        self.switch = manager.deduplicate
+
+    async def _connect_database(self):
+        self.database = await connect(self.file)
+        self.cursor = await self.database.cursor()
+        await self.database.execute(
+            "CREATE TABLE IF NOT EXISTS blob_data ("
+            "HASH TEXT PRIMARY KEY,"
+            "FORMAT TEXT NOT NULL,"
+            "SIZE INTEGER,"
+            "LINKS INTEGER"
+            ");"
+        )
+        await self.database.execute(
+            "CREATE TABLE IF NOT EXISTS blob_token ("
+            "TOKEN TEXT PRIMARY KEY,"
+            "HASH TEXT NOT NULL"
+            ");"
+        )
+        await self.database.commit()
+
+    def path(self, hash_: str, format_: str) -> Path:
+        return self.root.joinpath(hash_[:2], f"{hash_}.{format_}")
+
+    @staticmethod
+    def token(url: str) -> str:
+        # 不同 CDN 域名下的相同路径视为同一个文件
+        return urlparse(url)._replace(scheme="", netloc="").geturl()
+
+    async def select(self, url: str) -> Path | None:
+        if self.switch:
+            await self.cursor.execute(
+                "SELECT blob_data.HASH, FORMAT FROM blob_token "
+                "JOIN blob_data ON blob_data.HASH = blob_token.HASH "
+                "WHERE TOKEN=?",
+                (self.token(url),),
+            )
+            # 不检查文件是否存在，文件已被删除时由调用方重新下载
+            if row := await self.cursor.fetchone():
+                return self.path(*row)
+
+    async def add(
+        self,
+        hash_: str,
+        format_: str,
+        size: int,
+        url: str,
+        *args,
+        **kwargs,
+    ) -> None:
+        if self.switch:
+            await self.database.execute(
+                "INSERT INTO blob_data VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (HASH) DO UPDATE SET LINKS=LINKS + 1;",
+                (hash_, format_, size),
+            )
+            await self.database.execute(
+                "REPLACE INTO blob_token VALUES (?, ?);",
+                (self.token(url), hash_),
+            )
+            await self.database.commit()
+
+    async def link(self, url: str) -> None:
+        if self.switch:
+            await self.database.execute(
+                "UPDATE blob_data SET LINKS=LINKS + 1 WHERE HASH="
+                "(SELECT HASH FROM blob_token WHERE TOKEN=?);",
+                (self.token(url),),
+            )
+            await self.database.commit()
+
+    async def report(self) -> dict:
+        if self.switch:
+            await self.cursor.execute(
+                "SELECT COUNT(*), TOTAL(LINKS), TOTAL(SIZE), "
+                "TOTAL(SIZE * (LINKS - 1)) FROM blob_data"
+            )
+            blobs, links, size, saved = await self.cursor.fetchone()
+            return {
+                "blobs": blobs,
+                "links": int(links),
+                "size": int(size),
+                "saved": int(saved),
+            }
+        return {}
+
+    async def delete(self, ids: list[str]):
+        pass
+
+    async def all(self):
+        pass
+
+
+class JournalRecorder(IDRecorder):
+    JOURNAL_TABLE = (
+        ("URL", "TEXT PRIMARY KEY"),
+        ("TEMP", "TEXT NOT NULL"),
+        ("PATH", "TEXT"),
+        ("NAME", "TEXT"),
+        ("FORMAT", "TEXT"),
+        ("LENGTH", "INTEGER"),
+        ("VALIDATOR", "TEXT"),
+        ("DONE", "INTEGER"),
+        ("ID", "TEXT"),
+        ("NUMBER", "INTEGER"),
+        ("MTIME", "REAL"),
+        ("SUFFIX", "TEXT"),
+    )
+
+    def __init__(self, manager: "Manager"):
+        super().__init__(manager)
+        self.file = manager.root.joinpath("DownloadJournal.db")
+        self.switch = True
+
+    async def _connect_database(self):
+        self.database = await connect(self.file)
+        self.cursor = await self.database.cursor()
+        await self.database.execute(f"""CREATE TABLE IF NOT EXISTS download_journal (
+        {",".join(" ".join(i) for i in self.JOURNAL_TABLE)}
+        );""")
+        await self.database.commit()
+
+    async def select(self, url: str) -> dict | None:
+        await self.cursor.execute("SELECT * FROM download_journal WHERE URL=?", (url,))
+        if row := await self.cursor.fetchone():
+            return dict(zip((i for i, _ in self.JOURNAL_TABLE), row))
+
+    async def add(self, **kwargs) -> None:
+        await self.database.execute(
+            f"""REPLACE INTO download_journal VALUES (
+        {", ".join("?" for _ in self.JOURNAL_TABLE)}
+        );""",
+            tuple(kwargs.get(i) for i, _ in self.JOURNAL_TABLE),
+        )
+        await self.database.commit()
+
+    async def update(self, url: str, done: int) -> None:
+        await self.database.execute(
+            "UPDATE download_journal SET DONE=? WHERE URL=?", (done, url)
+        )
+        await self.database.commit()
+
+    async def delete(self, urls: list[str]):
+        await self.database.executemany(
+            "DELETE FROM download_journal WHERE URL=?", [(i,) for i in urls]
+        )
+        await self.database.commit()
+
+    async def all(self) -> list[dict]:
+        await self.cursor.execute("SELECT * FROM download_journal")
+        return [
+            dict(zip((i for i, _ in self.JOURNAL_TABLE), row))
+            for row in await self.cursor.fetchall()
+        ]
@@ -2,7 +2,7 @@ from json import dump, load
 from pathlib import Path
 from platform import system
 
-from .static import ROOT, USERAGENT
+from .static import CONNECTION_POOL, ROOT, USERAGENT
 
 __all__ = ["Settings"]
 
@@ -28,6 +28,27 @@ class Settings:
         "download_record": True,
         "author_archive": False,
         "write_mtime": False,
+        "deduplicate": False,
+        "file_index": True,
+        "bandwidth_day": 0,
+        "bandwidth_night": 0,
+        "folder_shard": "",
+        "memory_budget": 0,
+        "video_quality": "origin",
+        "video_codec": "",
+        "live_quality": "h264",
+        "live_mode": "",
+        "cdn_hosts": {
+            "image": [],
+            "original": [],
+            "video": [],
+        },
+        "cdn_hedge": 0,
+        "page_hedge": 0,
+        "hedge_proxy": "",
+        "request_pool": dict(CONNECTION_POOL),
+        "download_pool": dict(CONNECTION_POOL),
+        "warm_up": True,
         "language": "zh_CN",
     }
     encode = "UTF-8-SIG" if system() == "Windows" else "UTF-8"
@@ -40,7 +61,8 @@ class Settings:
 
     def read(self) -> dict:
         with self.file.open("r", encoding=self.encode) as f:
-            return load(f)
+            # 旧版本配置文件缺少新增参数时，使用默认值补全
+            return self.default | load(f)
 
     def create(self) -> dict:
         with self.file.open("w", encoding=self.encode) as f:
@@ -27,6 +27,21 @@ HEADERS = {
     "user-agent": USERAGENT,
 }
 
+# 各类型作品文件的默认 CDN 域名；image 为转换格式的图片，original 为原始图片
+CDN_HOSTS = {
+    "image": "ci.xiaohongshu.com",
+    "original": "sns-img-bd.xhscdn.com",
+    "video": "sns-video-bd.xhscdn.com",
+}
+
+# 连接池默认参数，keepalive_expiry 单位：秒
+CONNECTION_POOL = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30,
+    "http2": False,
+}
+
 MASTER = "b #fff200"
 PROMPT = "b turquoise2"
 GENERAL = "b bright_white"
@@ -64,6 +79,15 @@ FILE_SIGNATURES: tuple[
 FILE_SIGNATURES_LENGTH = max(
     offset + len(signature) for offset, signature, _ in FILE_SIGNATURES
 )
+# 按偏移量与签名长度分组，每组仅需一次切片与字典查找；值为签名序号与后缀，序号用于保持原有匹配顺序
+FILE_SIGNATURES_MATCHER: dict[tuple[int, int], dict[bytes, tuple[int, str]]] = {
+    group: {
+        signature: (index, suffix)
+        for index, (offset, signature, suffix) in enumerate(FILE_SIGNATURES)
+        if (offset, len(signature)) == group
+    }
+    for group in dict.fromkeys((i[0], len(i[1])) for i in FILE_SIGNATURES)
+}
 
 MAX_WORKERS: int = 4
 
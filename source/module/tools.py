@@ -1,11 +1,12 @@
-from asyncio import sleep
+from asyncio import AbstractEventLoop, sleep
+from functools import partial
 from random import uniform
 
 from rich import print
 from rich.text import Text
 
 from ..translation import _
-from .static import INFO
+from .static import FILE_SIGNATURES_MATCHER, INFO
 
 
 def retry(function):
@@ -37,6 +38,17 @@ def retry_limited(function):
     return inner
 
 
+def match_signature(start: bytes) -> str:
+    """根据文件开头的字节判断文件格式，无法判断时返回空字符串"""
+    result = None
+    for (offset, length), signatures in FILE_SIGNATURES_MATCHER.items():
+        if (i := signatures.get(start[offset : offset + length])) and (
+            not result or i < result
+        ):
+            result = i
+    return result[1] if result else ""
+
+
 def logging(log, text, style=INFO):
     string = Text(text, style=style)
     if log:
@@ -48,6 +60,17 @@ def logging(log, text, style=INFO):
         print(string)
 
 
+class ThreadLog:
+    """在工作线程中输出日志时，将写入操作转交给事件循环执行"""
+
+    def __init__(self, log, loop: AbstractEventLoop):
+        self.log = log
+        self.loop = loop
+
+    def write(self, *args, **kwargs):
+        self.loop.call_soon_threadsafe(partial(self.log.write, *args, **kwargs))
+
+
 async def sleep_time(
     min_time: int | float = 1.0,
     max_time: int | float = 2.5,
@@ -0,0 +1,188 @@
+from asyncio import CancelledError, all_tasks, create_task, current_task, run, sleep
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response
+
+import source.expansion.cdn as cdn
+from source.expansion import HostPool
+
+DEFAULTS = {"image": "ci.xiaohongshu.com", "video": "sns-video-bd.xhscdn.com"}
+HOSTS = {"image": ["a.test", "b.test", "c.test"]}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def hosts(urls: list[str]) -> list[str]:
+    return [i.split("/")[2] for i in urls]
+
+
+def test_candidates():
+    pool = HostPool(DEFAULTS, HOSTS)
+    assert hosts(pool.candidates("https://a.test/1")) == ["a.test", "b.test", "c.test"]
+    # 作品数据中的默认域名替换为设置的域名，保留路径与参数
+    assert pool.candidates("https://ci.xiaohongshu.com/1?x=1") == [
+        "https://a.test/1?x=1",
+        "https://b.test/1?x=1",
+        "https://c.test/1?x=1",
+    ]
+    assert pool.candidates("https://sns-video-bd.xhscdn.com/2") == [
+        "https://sns-video-bd.xhscdn.com/2"
+    ]
+    assert pool.candidates("https://other.test/3") == ["https://other.test/3"]
+
+
+def test_candidates_latency():
+    pool = HostPool(DEFAULTS, HOSTS)
+    pool.success("a.test", 0.5)
+    pool.success("b.test", 0.1)
+    pool.success("c.test", 0.3)
+    assert hosts(pool.candidates("https://a.test/1")) == ["b.test", "c.test", "a.test"]
+    # 指数移动平均平滑单次延迟波动
+    pool.success("b.test", 1.1)
+    assert pool.latency["b.test"] == pytest.approx(0.4)
+    assert hosts(pool.candidates("https://a.test/1")) == ["c.test", "b.test", "a.test"]
+
+
+def test_failure_cooldown(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cdn, "monotonic", clock.monotonic)
+    pool = HostPool(DEFAULTS, HOSTS)
+    pool.failure("a.test")
+    assert "a.test" not in pool.disabled
+    assert hosts(pool.candidates("https://a.test/1")) == ["b.test", "c.test", "a.test"]
+    pool.failure("a.test")
+    assert pool.disabled["a.test"] == clock.now + HostPool.COOLDOWN
+    assert not pool.status()["hosts"]["a.test"]["available"]
+    # 暂停使用的域名排在失败次数更多的可用域名之后
+    for _ in range(3):
+        pool.failure("b.test")
+    clock.now += HostPool.COOLDOWN / 2
+    pool.disabled.pop("b.test")
+    assert hosts(pool.candidates("https://a.test/1"))[-1] == "a.test"
+    clock.now += HostPool.COOLDOWN
+    assert pool.status()["hosts"]["a.test"]["available"]
+    pool.success("a.test", 0.1)
+    assert pool.failures.get("a.test") is None
+    assert "a.test" not in pool.disabled
+
+
+def request(pool: HostPool, handler, url: str = "https://a.test/1") -> tuple:
+    async def main():
+        async with AsyncClient(transport=MockTransport(handler)) as client:
+            try:
+                async with pool.stream(client, url, {}) as response:
+                    response.raise_for_status()
+                    return response.url.host, await response.aread()
+            except Exception as error:
+                return None, error
+
+    return run(main())
+
+
+def test_failover():
+    pool = HostPool(DEFAULTS, HOSTS)
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.host)
+        if request.url.host == "a.test":
+            raise ConnectError("refused", request=request)
+        return Response(200, content=b"ok")
+
+    host, error = request(pool, handler)
+    assert host is None
+    assert isinstance(error, ConnectError)
+    # 失败后下一次请求改用其他域名，尚未测量延迟的域名优先尝试
+    assert request(pool, handler) == ("b.test", b"ok")
+    assert request(pool, handler) == ("c.test", b"ok")
+    assert requested == ["a.test", "b.test", "c.test"]
+    assert hosts(pool.candidates("https://a.test/1"))[-1] == "a.test"
+    assert pool.failures["a.test"] == 1
+    assert "b.test" not in pool.failures
+
+
+def test_status_failure():
+    pool = HostPool(DEFAULTS, HOSTS)
+
+    def handler(request):
+        return Response(503 if request.url.host == "a.test" else 200)
+
+    host, __ = request(pool, handler)
+    assert host is None
+    # 响应状态码异常同样计为失败
+    assert pool.failures["a.test"] == 1
+    assert hosts(pool.candidates("https://a.test/1"))[0] == "b.test"
+
+
+def hedge_handler(delays: dict[str, float]):
+    async def handler(request):
+        await sleep(delays[request.url.host])
+        return Response(200, content=request.url.host.encode())
+
+    return handler
+
+
+def test_hedge_win():
+    pool = HostPool(DEFAULTS, HOSTS, hedge=0.01)
+    host, data = request(pool, hedge_handler({"a.test": 1, "b.test": 0}))
+    assert (host, data) == ("b.test", b"b.test")
+    assert pool.hedges == pool.wins == 1
+    # 被取消的请求记录已等待的时间
+    assert pool.latency["a.test"] >= 0.01
+
+
+def test_hedge_skip():
+    pool = HostPool(DEFAULTS, HOSTS, hedge=0.5)
+    assert request(pool, hedge_handler({"a.test": 0, "b.test": 0})) == (
+        "a.test",
+        b"a.test",
+    )
+    assert pool.hedges == pool.wins == 0
+    assert "b.test" not in pool.latency
+
+
+def test_hedge_failure():
+    pool = HostPool(DEFAULTS, HOSTS, hedge=0.01)
+
+    async def handler(request):
+        if request.url.host == "a.test":
+            await sleep(0.05)
+            raise ConnectError("refused", request=request)
+        await sleep(1)
+        return Response(200, content=b"late")
+
+    # 首个请求失败时等待对冲请求完成
+    assert request(pool, handler) == ("b.test", b"late")
+    assert pool.failures["a.test"] == 1
+    assert pool.wins == 1
+
+
+def test_hedge_cancel():
+    pool = HostPool(DEFAULTS, HOSTS, hedge=0.02)
+    handler = hedge_handler({"a.test": 1, "b.test": 1})
+
+    async def main(delay: float) -> list:
+        async with AsyncClient(transport=MockTransport(handler)) as client:
+
+            async def stream():
+                async with pool.stream(client, "https://a.test/1", {}):
+                    pass
+
+            caller = create_task(stream())
+            await sleep(delay)
+            caller.cancel()
+            with pytest.raises(CancelledError):
+                await caller
+            return [i for i in all_tasks() if i is not current_task()]
+
+    # 调用方在发送对冲请求之前与之后被取消，均不遗留未完成的请求
+    assert run(main(0.01)) == []
+    assert pool.hedges == 0
+    assert run(main(0.05)) == []
+    assert pool.hedges == 1
@@ -0,0 +1,61 @@
+import pytest
+
+from source.expansion import Converter, StateScanner
+
+STATE = (
+    'window.__INITIAL_STATE__={"note":{"noteDetailMap":{"a":{"note":{"title":"t"}}}}}'
+)
+PAGE = (
+    "<html><head><script>var a = 1;</script>"
+    f"<script>{STATE}</script>"
+    "<script>var b = 2;</script></head><body>body</body></html>"
+)
+
+
+def feed(scanner: StateScanner, text: str, size: int) -> int | None:
+    """返回扫描完成时已读取的数据块数量"""
+    for index, start in enumerate(range(0, len(text), size), start=1):
+        if scanner.feed(text[start : start + size]):
+            return index
+    return None
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 8, 24, 25, 40, len(PAGE)])
+def test_scanner_chunks(size):
+    # 不同的分块大小使起始与结束标记落在数据块的不同位置
+    scanner = StateScanner()
+    count = feed(scanner, PAGE, size)
+    assert count is not None
+    assert scanner.content() == STATE
+    end = PAGE.index("</script>", PAGE.index(StateScanner.START)) + len("</script>")
+    # 读取到结束标记所在的数据块后立即停止
+    assert count == -(-end // size)
+
+
+def test_scanner_split_marker():
+    scanner = StateScanner()
+    assert not scanner.feed("<script>window.__INITIAL")
+    assert not scanner.feed("_STATE__={}</scr")
+    assert scanner.feed("ipt><body>")
+    assert scanner.content() == "window.__INITIAL_STATE__={}"
+
+
+def test_scanner_incomplete():
+    scanner = StateScanner()
+    assert feed(scanner, "<html><body>blocked</body></html>", 4) is None
+    assert scanner.content() == "<html><body>blocked</body></html>"
+    scanner = StateScanner()
+    # 脚本未结束时返回已读取的全部网页内容
+    assert feed(scanner, PAGE[: PAGE.index(STATE) + 10], 7) is None
+    assert scanner.content() == PAGE[: PAGE.index(STATE) + 10]
+
+
+def test_extract_object():
+    converter = Converter()
+    assert converter._extract_object("") == ""
+    assert converter._extract_object(PAGE) == STATE
+    scanner = StateScanner()
+    feed(scanner, PAGE, 16)
+    assert converter._extract_object(scanner.content()) == STATE
+    assert converter.run(scanner.content()) == {"title": "t"}
+    assert converter.run(PAGE) == {"title": "t"}
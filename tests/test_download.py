@@ -0,0 +1,398 @@
+from asyncio import create_task, gather, run, sleep
+from base64 import b64encode
+from gzip import compress
+from hashlib import md5
+from pathlib import Path
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+import source.application.download as download
+from source.application import XHS
+from source.application.download import Download
+from source.expansion import IntegrityError
+from source.module import JournalRecorder
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 2048
+
+
+async def no_sleep(*args, **kwargs):
+    pass
+
+
+def verify(*args):
+    # __verify 仅依赖类属性，无需初始化实例
+    return Download._Download__verify(object.__new__(Download), *args)
+
+
+def test_verify_length():
+    verify("a", "png", 100, 100, PNG, None)
+    verify("a", "png", None, 10, PNG, None)
+    with pytest.raises(IntegrityError) as error:
+        verify("a", "png", 100, 60, PNG, None)
+    assert error.value.resume
+    with pytest.raises(IntegrityError) as error:
+        verify("a", "png", 100, 60, PNG, None, False)
+    assert not error.value.resume
+    with pytest.raises(IntegrityError) as error:
+        verify("a", "png", 100, 120, PNG, None)
+    assert not error.value.resume
+
+
+def test_verify_signature():
+    verify("a", "png", None, 10, b"\xff\xd8\xff\xe0", None)
+    verify("a", "mp4", None, 10, b"\x00\x00\x00\x18ftypisom", None)
+    # 无法识别的二进制数据不视为异常
+    verify("a", "png", None, 10, b"\x00\x01\x02", None)
+    for start in (b"<html>", b' {"code": 1}', b"\x00\x00\x00\x18ftypisom"):
+        with pytest.raises(IntegrityError):
+            verify("a", "png", None, 10, start, None)
+
+
+def test_verify_checksum():
+    checksum = md5(PNG)
+    verify("a", "png", None, 10, PNG, (checksum, md5(PNG).digest()))
+    with pytest.raises(IntegrityError):
+        verify("a", "png", None, 10, PNG, (checksum, b"\x00" * 16))
+
+
+async def stream(data: bytes, size: int = 1024):
+    # 异步迭代的响应内容不会被预先读取，与网络响应相同
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def run_download(handler, monkeypatch) -> tuple[bool, bytes | None, list]:
+    monkeypatch.setattr(download, "sleep_time", no_sleep)
+
+    async def main(root: str):
+        app = XHS(work_path=root, download_record=False, warm_up=False, _print=False)
+        app.manager.retry = 0
+        worker = Download(app.manager)
+        worker.client = AsyncClient(transport=MockTransport(handler))
+        try:
+            __, result = await worker.run(
+                ["https://ci.xiaohongshu.com/1"],
+                [None],
+                None,
+                "",
+                "test",
+                "图文",
+                0,
+                None,
+                None,
+            )
+            file = app.manager.folder.joinpath("test_1.png")
+            temp = [i.stat().st_size for i in app.manager.temp.iterdir()]
+            return result[0], file.read_bytes() if file.is_file() else None, temp
+        finally:
+            await worker.client.aclose()
+            await app.manager.close()
+
+    with TemporaryDirectory() as root:
+        return run(main(root))
+
+
+def test_download_encoded(monkeypatch):
+    body = compress(PNG)
+
+    def handler(request):
+        return Response(
+            200,
+            content=stream(body),
+            headers={
+                "Content-Encoding": "gzip",
+                "Content-Length": str(len(body)),
+                "Content-MD5": b64encode(md5(body).digest()).decode(),
+            },
+        )
+
+    result, data, __ = run_download(handler, monkeypatch)
+    assert result
+    assert data == PNG
+
+
+def test_download_checksum_mismatch(monkeypatch):
+    def handler(request):
+        return Response(
+            200,
+            content=stream(PNG),
+            headers={
+                "Content-Length": str(len(PNG)),
+                "Content-MD5": b64encode(b"\x00" * 16).decode(),
+            },
+        )
+
+    result, data, temp = run_download(handler, monkeypatch)
+    assert not result
+    assert data is None
+    assert temp == []
+
+
+def test_download_incomplete(monkeypatch):
+    def handler(request):
+        return Response(
+            200,
+            content=stream(PNG[:1024]),
+            headers={"Content-Length": str(len(PNG))},
+        )
+
+    result, data, temp = run_download(handler, monkeypatch)
+    assert not result
+    assert data is None
+    # 数据不完整时保留缓存文件用于断点续传
+    assert temp == [1024]
+
+
+def test_download_html(monkeypatch):
+    def handler(request):
+        return Response(200, content=stream(b"<html>blocked</html>"))
+
+    result, data, __ = run_download(handler, monkeypatch)
+    assert not result
+    assert data is None
+
+
+def test_download_deleted(monkeypatch):
+    monkeypatch.setattr(download, "sleep_time", no_sleep)
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return Response(
+            200,
+            content=stream(PNG),
+            headers={"Content-Length": str(len(PNG))},
+        )
+
+    async def main(root: str):
+        app = XHS(work_path=root, download_record=False, warm_up=False, _print=False)
+        worker = Download(app.manager)
+        worker.client = AsyncClient(transport=MockTransport(handler))
+        urls = ["https://ci.xiaohongshu.com/1", "https://ci.xiaohongshu.com/2"]
+        try:
+            for _ in range(2):
+                await worker.run(
+                    urls, [None, None], None, "", "test", "图文", 0, None, None
+                )
+            # 文件夹内容已缓存，运行期间被删除的文件需要重新下载
+            app.manager.folder.joinpath("test_2.png").unlink()
+            __, result = await worker.run(
+                urls, [None, None], None, "", "test", "图文", 0, None, None
+            )
+            return result
+        finally:
+            await worker.client.aclose()
+            await app.manager.close()
+
+    with TemporaryDirectory() as root:
+        result = run(main(root))
+    assert result == [True]
+    assert sorted(requests) == ["/1", "/2", "/2"]
+
+
+def run_journal(handler, monkeypatch, main) -> list:
+    monkeypatch.setattr(download, "sleep_time", no_sleep)
+
+    async def wrapper(root: str):
+        app = XHS(work_path=root, download_record=False, warm_up=False, _print=False)
+        app.manager.retry = 0
+        journal = JournalRecorder(app.manager)
+        journal.file = Path(root).joinpath("DownloadJournal.db")
+        async with journal:
+            worker = Download(app.manager, journal=journal)
+            worker.client = AsyncClient(transport=MockTransport(handler))
+            try:
+                return await main(app.manager, worker, journal)
+            finally:
+                await worker.client.aclose()
+                await app.manager.close()
+
+    with TemporaryDirectory() as root:
+        return run(wrapper(root))
+
+
+@pytest.mark.parametrize("status, kept", [(403, False), (404, False), (503, True)])
+def test_journal_status(monkeypatch, status, kept):
+    def handler(request):
+        if request.headers.get("Range", "bytes=0-") != "bytes=0-":
+            return Response(status)
+        return Response(
+            200,
+            content=stream(PNG[:1024]),
+            headers={"Content-Length": str(len(PNG))},
+        )
+
+    async def main(manager, worker, journal):
+        url = "https://ci.xiaohongshu.com/1"
+        for _ in range(2):
+            await worker.run([url], [None], None, "", "test", "图文", 0, None, None)
+        return await journal.all(), list(manager.temp.iterdir())
+
+    entries, temp = run_journal(handler, monkeypatch, main)
+    # 下载地址失效时删除下载日志与缓存文件，服务器异常时保留，下次启动继续下载
+    assert bool(entries) is kept
+    assert bool(temp) is kept
+
+
+def test_same_url(monkeypatch):
+    async def handler(request):
+        await sleep(0.01)
+        return Response(
+            200,
+            content=stream(PNG),
+            headers={"Content-Length": str(len(PNG))},
+        )
+
+    async def main(manager, worker, journal):
+        url = ["https://ci.xiaohongshu.com/1"]
+        results = await gather(
+            *(
+                worker.run(url, [None], None, "", i, "图文", 0, None, None)
+                for i in ("a", "b", "c")
+            )
+        )
+        return [i[1] for i in results], sorted(
+            i.name for i in manager.folder.iterdir() if i.is_file()
+        )
+
+    # 相同链接的任务依次写入同一个缓存文件
+    results, files = run_journal(handler, monkeypatch, main)
+    assert results == [[True]] * 3
+    assert files == ["a_1.png", "b_1.png", "c_1.png"]
+
+
+def test_prepare(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("Range"))
+        if request.headers.get("Range") == "bytes=0-":
+            return Response(
+                200,
+                content=stream(PNG),
+                headers={"Content-Length": str(len(PNG))},
+            )
+        return Response(
+            206,
+            content=stream(PNG[1024:]),
+            headers={"Content-Range": f"bytes 1024-{len(PNG) - 1}/{len(PNG)}"},
+        )
+
+    async def main(manager, worker, journal):
+        url = "https://ci.xiaohongshu.com/1"
+        temp = manager.temp.joinpath("partial.png")
+        temp.write_bytes(PNG[:1024])
+        manager.temp.joinpath("orphan.png").write_bytes(b"")
+        await journal.add(
+            URL=url,
+            TEMP=str(temp),
+            PATH=str(manager.folder),
+            NAME="test_1",
+            FORMAT="png",
+            LENGTH=len(PNG),
+            DONE=1024,
+            SUFFIX="png",
+        )
+        entries = await worker.prepare()
+        # 清理缓存文件后开始的新任务等待继续下载完成
+        waiting = create_task(
+            worker.run([url], [None], None, "", "test", "图文", 0, None, None)
+        )
+        resumed = await worker.resume(entries)
+        __, result = await waiting
+        return (
+            resumed,
+            result,
+            sorted(i.name for i in manager.temp.iterdir()),
+            manager.folder.joinpath("test_1.png").read_bytes(),
+        )
+
+    resumed, result, temp, data = run_journal(handler, monkeypatch, main)
+    assert resumed == result == [True]
+    assert temp == []
+    assert data == PNG
+    # 继续下载完成后新任务才开始请求，缓存文件不会被同时写入
+    assert requests == ["bytes=1024-", "bytes=0-"]
+
+
+def test_folder_removed(monkeypatch):
+    monkeypatch.setattr(download, "sleep_time", no_sleep)
+
+    def handler(request):
+        return Response(
+            200,
+            content=stream(PNG),
+            headers={"Content-Length": str(len(PNG))},
+        )
+
+    async def main(root: str):
+        app = XHS(
+            work_path=root,
+            folder_mode=True,
+            download_record=False,
+            warm_up=False,
+            _print=False,
+        )
+        worker = Download(app.manager)
+        worker.client = AsyncClient(transport=MockTransport(handler))
+        url = ["https://ci.xiaohongshu.com/1"]
+        try:
+            await worker.run(url, [None], None, "", "test", "图文", 0, None, None)
+            # 文件夹已缓存，运行期间被删除时保存文件前重新创建
+            rmtree(app.manager.folder.joinpath("test"))
+            path, result = await worker.run(
+                url, [None], None, "", "test", "图文", 0, None, None
+            )
+            return result, path.joinpath("test_1.png").read_bytes()
+        finally:
+            await worker.client.aclose()
+            await app.manager.close()
+
+    with TemporaryDirectory() as root:
+        result, data = run(main(root))
+    assert result == [True]
+    assert data == PNG
+
+
+def test_signature_short_chunks(monkeypatch):
+    monkeypatch.setattr(download, "sleep_time", no_sleep)
+    webp = b"RIFF\x00\x08\x00\x00WEBPVP8 " + b"\x00" * 2048
+
+    def handler(request):
+        # webp 签名位于第 8 个字节之后，数据块短于签名长度
+        return Response(
+            200,
+            content=stream(webp, 3),
+            headers={"Content-Length": str(len(webp))},
+        )
+
+    async def main(root: str):
+        app = XHS(work_path=root, download_record=False, warm_up=False, _print=False)
+        worker = Download(app.manager)
+        worker.client = AsyncClient(transport=MockTransport(handler))
+        try:
+            __, result = await worker.run(
+                ["https://ci.xiaohongshu.com/1"],
+                [None],
+                None,
+                "",
+                "test",
+                "图文",
+                0,
+                None,
+                None,
+            )
+            return result, sorted(
+                i.name for i in app.manager.folder.iterdir() if i.is_file()
+            )
+        finally:
+            await worker.client.aclose()
+            await app.manager.close()
+
+    with TemporaryDirectory() as root:
+        result, files = run(main(root))
+    assert result == [True]
+    assert files == ["test_1.webp"]
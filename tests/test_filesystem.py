@@ -0,0 +1,44 @@
+from asyncio import gather, run
+from pathlib import Path
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+
+from source.expansion import FileSystem
+
+
+def test_mkdir_shared():
+    async def main(root: Path):
+        fs = FileSystem()
+        folder = root.joinpath("a", "b")
+        await gather(*(fs.mkdir(folder) for _ in range(5)))
+        operations = fs.operations
+        await fs.mkdir(folder)
+        fs.close()
+        return folder.is_dir(), operations, fs.operations, fs.created
+
+    with TemporaryDirectory() as root:
+        root = Path(root)
+        exists, first, second, created = run(main(root))
+    assert exists
+    assert first == second == 1
+    assert created == {root.joinpath("a"), root.joinpath("a", "b")}
+
+
+def test_mkdir_recreate():
+    async def main(root: Path):
+        fs = FileSystem()
+        folder = root.joinpath("a", "b")
+        await fs.mkdir(folder)
+        # 运行期间文件夹被删除，命中缓存时不访问文件系统
+        rmtree(root.joinpath("a"))
+        operations = fs.operations
+        await fs.mkdir(folder)
+        cached = folder.is_dir(), fs.operations - operations
+        await fs.mkdir(folder, True)
+        fs.close()
+        return cached, folder.is_dir()
+
+    with TemporaryDirectory() as root:
+        cached, exists = run(main(Path(root)))
+    assert cached == (False, 0)
+    assert exists
@@ -0,0 +1,136 @@
+from asyncio import CancelledError, all_tasks, create_task, current_task, run, sleep
+
+import pytest
+
+from source.expansion import HedgePolicy
+
+
+def create_policy(samples, budget: float = 10, percentile: float = 95) -> HedgePolicy:
+    policy = HedgePolicy(budget, percentile)
+    policy.samples.extend(samples)
+    return policy
+
+
+def test_set_budget():
+    assert HedgePolicy().budget == 0
+    assert HedgePolicy(5).budget == pytest.approx(0.05)
+    assert HedgePolicy(-1).budget == 0
+    assert HedgePolicy(150).budget == 1
+    policy = HedgePolicy(5)
+    policy.set_budget()
+    assert policy.budget == pytest.approx(0.05)
+    policy.set_budget("20")
+    assert policy.status()["budget"] == 20
+    assert HedgePolicy(5, 0).percentile == 1
+    assert HedgePolicy(5, 120).percentile == 100
+
+
+def test_delay_samples():
+    samples = [i / 10 for i in range(1, HedgePolicy.SAMPLES)]
+    assert create_policy(samples).delay() is None
+    assert create_policy(samples + [2.0]).delay() is not None
+    # budget 为 0 时不启用对冲请求
+    assert create_policy(samples + [2.0], 0).delay() is None
+
+
+def test_delay_percentile():
+    # 样本为 0.01 至 1.00 秒，乱序添加
+    samples = [i / 100 for i in range(100, 0, -1)]
+    assert create_policy(samples, percentile=95).delay() == pytest.approx(0.95)
+    assert create_policy(samples, percentile=50).delay() == pytest.approx(0.51)
+    assert create_policy(samples, percentile=100).delay() == pytest.approx(1.0)
+    assert create_policy(samples[:20], percentile=95).delay() == pytest.approx(0.99)
+
+
+def test_delay_minimum():
+    policy = create_policy([0.001] * HedgePolicy.SAMPLES)
+    assert policy.delay() == HedgePolicy.MIN_DELAY
+
+
+def test_window():
+    policy = create_policy([10.0] * HedgePolicy.WINDOW)
+    policy.samples.extend([0.1] * HedgePolicy.WINDOW)
+    # 仅保留最近的样本
+    assert len(policy.samples) == HedgePolicy.WINDOW
+    assert policy.delay() == pytest.approx(0.1)
+
+
+def timed(result, delay: float):
+    async def request():
+        await sleep(delay)
+        return result
+
+    return request
+
+
+def test_run_without_samples():
+    policy = HedgePolicy(100)
+    assert run(policy.run(timed("primary", 0.01), timed("secondary", 0))) == "primary"
+    assert policy.hedges == 0
+    assert len(policy.samples) == 1
+
+
+def test_run_hedge_win():
+    policy = create_policy([0.01] * HedgePolicy.SAMPLES, 100)
+    assert run(policy.run(timed("primary", 1), timed("secondary", 0))) == "secondary"
+    assert (policy.requests, policy.hedges, policy.wins) == (1, 1, 1)
+    # 对冲请求胜出时记录的耗时包含等待时间
+    assert policy.samples[-1] >= HedgePolicy.MIN_DELAY
+
+
+def test_run_primary_win():
+    policy = create_policy([0.01] * HedgePolicy.SAMPLES, 100)
+    assert run(policy.run(timed("primary", 0.1), timed("secondary", 1))) == "primary"
+    assert (policy.hedges, policy.wins) == (1, 0)
+
+
+def test_run_budget():
+    # 样本数量足够多，本次测试的耗时不影响对冲延迟
+    policy = create_policy([0.01] * HedgePolicy.WINDOW, 10, 50)
+
+    async def main():
+        return [
+            await policy.run(timed("primary", 0.06), timed("secondary", 0))
+            for _ in range(20)
+        ]
+
+    results = run(main())
+    # 对冲请求数量不超过请求总数的 10%
+    assert policy.hedges == 2
+    assert results.count("secondary") == 2
+    assert results[:9] == ["primary"] * 9
+    assert results[9] == "secondary"
+
+
+def test_run_failure():
+    policy = create_policy([0.01] * HedgePolicy.SAMPLES, 100)
+
+    async def fail():
+        await sleep(0.06)
+        raise ValueError("primary")
+
+    # 首个请求失败时等待对冲请求完成
+    assert run(policy.run(fail, timed("secondary", 0.1))) == "secondary"
+    policy = HedgePolicy()
+    with pytest.raises(ValueError):
+        run(policy.run(fail))
+    assert len(policy.samples) == 0
+
+
+def test_run_cancel():
+    policy = create_policy([0.01] * HedgePolicy.SAMPLES, 100)
+
+    async def main(delay: float) -> list:
+        caller = create_task(policy.run(timed("primary", 1), timed("secondary", 1)))
+        await sleep(delay)
+        caller.cancel()
+        with pytest.raises(CancelledError):
+            await caller
+        return [i for i in all_tasks() if i is not current_task()]
+
+    # 调用方在发送对冲请求之前与之后被取消，均不遗留未完成的请求
+    assert run(main(0.01)) == []
+    assert policy.hedges == 0
+    assert run(main(0.1)) == []
+    assert policy.hedges == 1
+    assert len(policy.samples) == HedgePolicy.SAMPLES
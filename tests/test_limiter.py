@@ -0,0 +1,64 @@
+from asyncio import run
+
+import source.expansion.limiter as limiter
+from source.expansion import BandwidthLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.waits = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.waits.append(delay)
+        self.now += delay
+
+
+def create_limiter(monkeypatch, day: float) -> tuple[BandwidthLimiter, Clock]:
+    clock = Clock()
+    monkeypatch.setattr(limiter, "monotonic", clock.monotonic)
+    monkeypatch.setattr(limiter, "sleep", clock.sleep)
+    monkeypatch.setattr(BandwidthLimiter, "is_night", lambda self: False)
+    return BandwidthLimiter(day, 0), clock
+
+
+def test_unlimited(monkeypatch):
+    bucket, clock = create_limiter(monkeypatch, 0)
+    run(bucket.acquire(10 * 1000 * 1000))
+    assert clock.waits == []
+
+
+def test_rate(monkeypatch):
+    # 8 Mbit/s 即 1000000 字节/秒
+    bucket, clock = create_limiter(monkeypatch, 8)
+    assert bucket.rate == 1000 * 1000
+
+    async def main():
+        for _ in range(4):
+            await bucket.acquire(500 * 1000)
+
+    run(main())
+    assert clock.now == 2.0
+    assert clock.waits == [0.5, 0.5, 0.5, 0.5]
+
+
+def test_burst(monkeypatch):
+    bucket, clock = create_limiter(monkeypatch, 8)
+    # 空闲时间积累的令牌不超过一秒的流量
+    clock.now = 10.0
+    run(bucket.acquire(1000 * 1000))
+    assert clock.waits == []
+    run(bucket.acquire(1000 * 1000))
+    assert clock.waits == [1.0]
+
+
+def test_set_limit(monkeypatch):
+    bucket, __ = create_limiter(monkeypatch, 8)
+    bucket.set_limit(night=-1)
+    assert bucket.night == 0
+    bucket.set_limit(day=16)
+    assert bucket.rate == 2 * 1000 * 1000
+    assert bucket.status()["day"] == 16
@@ -0,0 +1,98 @@
+from asyncio import run
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+from source.module import Mapping
+
+
+def create_mapping(root: Path) -> Mapping:
+    manager = SimpleNamespace(
+        root=root,
+        folder=root,
+        folder_mode=False,
+        folder_shard="",
+        shard=None,
+        author_archive=True,
+    )
+    return Mapping(manager, None)
+
+
+def write_journal(mapping: Mapping, operations: list, done: list[int]) -> Path:
+    mapping.journal.mkdir(exist_ok=True)
+    file = mapping.journal.joinpath("1.json")
+    header = {"id": "1", "alias": "new", "old_alias": "old", "operations": operations}
+    file.write_text(
+        dumps(header) + "\n" + "".join(f"{i}\n" for i in done),
+        encoding="utf-8",
+    )
+    return file
+
+
+async def recover(mapping: Mapping):
+    mapping.recover()
+    await mapping.close()
+
+
+def test_recover_continue():
+    with TemporaryDirectory() as folder:
+        root = Path(folder)
+        old_folder, new_folder = root.joinpath("1_old"), root.joinpath("1_new")
+        # 文件夹已重命名，但文件尚未处理时中断
+        new_folder.mkdir()
+        new_folder.joinpath("a_old.png").write_bytes(b"a")
+        new_folder.joinpath("b_old.png").write_bytes(b"b")
+        mapping = create_mapping(root)
+        file = write_journal(
+            mapping,
+            [
+                (str(old_folder), str(new_folder), True),
+                (
+                    str(new_folder.joinpath("a_old.png")),
+                    str(new_folder.joinpath("a_new.png")),
+                    False,
+                ),
+                (
+                    str(new_folder.joinpath("b_old.png")),
+                    str(new_folder.joinpath("b_new.png")),
+                    False,
+                ),
+            ],
+            [0],
+        )
+        run(recover(mapping))
+        assert not file.exists()
+        assert sorted(i.name for i in new_folder.iterdir()) == [
+            "a_new.png",
+            "b_new.png",
+        ]
+
+
+def test_recover_keep_journal_on_failure():
+    with TemporaryDirectory() as folder:
+        root = Path(folder)
+        old_folder, new_folder = root.joinpath("1_old"), root.joinpath("1_new")
+        old_folder.mkdir()
+        old_folder.joinpath("a_old.png").write_bytes(b"a")
+        # 目标位置已存在非空文件夹，重命名失败
+        new_folder.mkdir()
+        new_folder.joinpath("other").write_bytes(b"")
+        mapping = create_mapping(root)
+        file = write_journal(
+            mapping,
+            [
+                (str(old_folder), str(new_folder), True),
+                (
+                    str(new_folder.joinpath("a_old.png")),
+                    str(new_folder.joinpath("a_new.png")),
+                    False,
+                ),
+            ],
+            [],
+        )
+        run(recover(mapping))
+        assert file.exists()
+        # 失败的步骤与后续步骤均未记录为已完成
+        assert file.read_text(encoding="utf-8").splitlines()[1:] == []
+        assert old_folder.joinpath("a_old.png").exists()
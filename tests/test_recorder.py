@@ -0,0 +1,171 @@
+from asyncio import run
+from pathlib import Path
+from sqlite3 import OperationalError
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+from source.module import DataRecorder
+
+
+def test_parse_count():
+    assert DataRecorder.parse_count("1234") == 1234
+    assert DataRecorder.parse_count(56) == 56
+    assert DataRecorder.parse_count("1.5万") == 15000
+    assert DataRecorder.parse_count("10万+") == 100000
+    assert DataRecorder.parse_count("2千") == 2000
+    assert DataRecorder.parse_count(" 3亿 ") == 300000000
+
+
+def test_parse_count_invalid():
+    assert DataRecorder.parse_count("") is None
+    assert DataRecorder.parse_count("赞") is None
+    assert DataRecorder.parse_count("万") is None
+    assert DataRecorder.parse_count("-1") is None
+    assert DataRecorder.parse_count(-1) is None
+
+
+def test_snapshot_skip_invalid():
+    def item(likes: str) -> dict:
+        data = {i: "" for i, _ in DataRecorder.DATA_TABLE}
+        return data | {
+            "作品ID": "1",
+            "收藏数量": "10",
+            "评论数量": "1",
+            "分享数量": "0",
+            "点赞数量": likes,
+        }
+
+    async def main(folder: Path):
+        manager = SimpleNamespace(
+            root=folder,
+            folder=folder,
+            download_record=True,
+            record_data=True,
+        )
+        async with DataRecorder(manager) as recorder:
+            for likes in ("100", "-1", "150", "80"):
+                await recorder.add(**item(likes))
+            return await recorder.rollup("1"), await recorder.history("1")
+
+    with TemporaryDirectory() as folder:
+        rollup, history = run(main(Path(folder)))
+    assert rollup["采集次数"] == 4
+    assert rollup["点赞数量_首次"] == 100
+    assert rollup["点赞数量_最新"] == 80
+    assert rollup["点赞数量_最小"] == 80
+    assert rollup["点赞数量_最大"] == 150
+    assert [i["点赞数量"] for i in history] == [100, None, 150, 80]
+    assert [i["收藏数量"] for i in history] == [10, 10, 10, 10]
+
+
+def test_paginate():
+    assert DataRecorder.paginate(0, -1) == (1, 1)
+    assert DataRecorder.paginate(-5, 20) == (1, 20)
+    assert DataRecorder.paginate(3, 1000) == (3, DataRecorder.PAGE_SIZE)
+
+
+def test_search_clamp():
+    async def main(folder: Path):
+        manager = SimpleNamespace(
+            root=folder,
+            folder=folder,
+            download_record=True,
+            record_data=True,
+        )
+        async with DataRecorder(manager) as recorder:
+            for i in range(5):
+                data = {j: "" for j, _ in DataRecorder.DATA_TABLE}
+                await recorder.add(
+                    **data | {"作品ID": str(i), "作品标题": "测试作品标题"}
+                )
+            return (
+                await recorder.search("测试作品", 1, -1),
+                await recorder.search("测试作品", -1, 2),
+            )
+
+    with TemporaryDirectory() as folder:
+        (total, first), (__, second) = run(main(Path(folder)))
+    assert total == 5
+    assert len(first) == 1
+    assert len(second) == 2
+
+
+def create_manager(folder: Path, record_data: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(
+        root=folder,
+        folder=folder,
+        download_record=True,
+        record_data=record_data,
+    )
+
+
+async def tables(recorder: DataRecorder) -> set[str]:
+    await recorder.cursor.execute("SELECT name FROM sqlite_master")
+    return {i[0] for i in await recorder.cursor.fetchall()}
+
+
+def test_search_index_disabled():
+    async def main(folder: Path):
+        async with DataRecorder(create_manager(folder, False)) as recorder:
+            return await tables(recorder), await recorder.search("测试作品")
+
+    with TemporaryDirectory() as folder:
+        names, result = run(main(Path(folder)))
+    assert "explore_search" not in names
+    assert result == (0, [])
+
+
+def test_search_fallback(monkeypatch):
+    async def unsupported(self):
+        raise OperationalError("no such tokenizer: trigram")
+
+    async def main(folder: Path, id_: str):
+        async with DataRecorder(create_manager(folder)) as recorder:
+            data = {j: "" for j, _ in DataRecorder.DATA_TABLE}
+            await recorder.add(**data | {"作品ID": "1", "作品标题": "测试作品标题"})
+            await recorder.add(**data | {"作品ID": id_, "作品描述": "其他内容"})
+            return (
+                recorder.fts,
+                await tables(recorder),
+                await recorder.search("作品 标题"),
+                await recorder.search("其他内容"),
+            )
+
+    with TemporaryDirectory() as folder:
+        # 创建索引后在不支持全文索引的环境中打开，触发器被删除，数据仍可写入
+        assert run(main(Path(folder), "2"))[0]
+        monkeypatch.setattr(
+            DataRecorder,
+            "_DataRecorder__create_search_table",
+            unsupported,
+        )
+        fts, names, (total, items), (other, __) = run(main(Path(folder), "3"))
+        monkeypatch.undo()
+        # 重新启用全文索引时重建过期的索引
+        assert run(main(Path(folder), "2"))[3][0] == 2
+    assert not fts
+    assert not names & set(DataRecorder.SEARCH_TRIGGERS)
+    assert total == 1
+    assert items[0]["作品ID"] == "1"
+    assert other == 2
+
+
+def test_link():
+    async def main(folder: Path):
+        async with DataRecorder(create_manager(folder)) as recorder:
+            data = {j: "" for j, _ in DataRecorder.DATA_TABLE}
+            url = "https://www.xiaohongshu.com/explore/1"
+            await recorder.add(**data | {"作品ID": "1", "作品链接": url})
+            await recorder.add_link("1", f"{url}?xsec_token=abc")
+            return (
+                (await recorder.select("1"))["作品链接"],
+                await recorder.select_link("1"),
+                await recorder.select_link("2"),
+            )
+
+    with TemporaryDirectory() as folder:
+        link, token, missing = run(main(Path(folder)))
+    # 作品数据中的作品链接保持不变，访问链接单独存储
+    assert link == "https://www.xiaohongshu.com/explore/1"
+    assert token == "https://www.xiaohongshu.com/explore/1?xsec_token=abc"
+    assert missing is None
@@ -0,0 +1,47 @@
+from asyncio import run
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from source.application import XHS
+from source.module import DataRecorder, Manager
+
+FIRST = "64a1b2c3000000001e03abcd"
+SECOND = "65a1b2c3000000001e03abcd"
+
+
+def test_reshard_failure(monkeypatch):
+    move = Manager.move
+
+    def locked(temp: Path, path: Path, *args, **kwargs):
+        if FIRST in temp.name:
+            raise PermissionError("file in use")
+        return move(temp, path, *args, **kwargs)
+
+    async def main(root: str):
+        app = XHS(
+            work_path=root,
+            record_data=True,
+            folder_shard="author",
+            warm_up=False,
+            _print=False,
+        )
+        folder = app.manager.folder
+        async with app.file_recorder, app.data_recorder:
+            for id_, author in ((FIRST, "a1"), (SECOND, "a2")):
+                folder.joinpath(f"{id_}.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+                data = {i: "" for i, _ in DataRecorder.DATA_TABLE}
+                await app.data_recorder.add(**data | {"作品ID": id_, "作者ID": author})
+            monkeypatch.setattr(Manager, "move", staticmethod(locked))
+            moved = await app.reshard()
+            files = {
+                Path(i[0]).relative_to(folder).as_posix()
+                for i in await app.file_recorder.all()
+            }
+            await app.manager.close()
+        return moved, files, app.manager.shard("a2", None)
+
+    with TemporaryDirectory() as root:
+        moved, files, shard = run(main(root))
+    # 移动失败的文件保留原位置，已移动的文件更新索引
+    assert moved == 1
+    assert files == {f"{FIRST}.png", f"{shard}/{SECOND}.png"}
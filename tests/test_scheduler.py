@@ -0,0 +1,114 @@
+from asyncio import Event, create_task, gather, run, sleep
+
+import source.expansion.scheduler as scheduler
+from source.expansion import Priority, Scheduler
+
+
+async def run_tasks(pool: Scheduler, tasks: list[tuple[str, Priority, int]]) -> list:
+    order = []
+    release = Event()
+
+    async def hold():
+        async with pool.slot(Priority.NORMAL):
+            await release.wait()
+
+    async def work(name: str, priority: Priority, size: int):
+        async with pool.slot(priority, size):
+            order.append(name)
+
+    blocker = create_task(hold())
+    await sleep(0)
+    workers = [create_task(work(*i)) for i in tasks]
+    await sleep(0)
+    release.set()
+    await gather(blocker, *workers)
+    return order
+
+
+def test_priority_order():
+    order = run(
+        run_tasks(
+            Scheduler(1),
+            [
+                ("background", Priority.BACKGROUND, 0),
+                ("normal", Priority.NORMAL, 0),
+                ("interactive", Priority.INTERACTIVE, 0),
+            ],
+        )
+    )
+    assert order == ["interactive", "normal", "background"]
+
+
+def test_size_order():
+    order = run(
+        run_tasks(
+            Scheduler(1),
+            [
+                ("large", Priority.NORMAL, 300),
+                ("small", Priority.NORMAL, 100),
+                ("same", Priority.NORMAL, 100),
+            ],
+        )
+    )
+    # 大小相同时按提交顺序执行
+    assert order == ["small", "same", "large"]
+
+
+def test_aging(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(scheduler, "monotonic", lambda: now[0])
+
+    async def main():
+        pool = Scheduler(1)
+        order = []
+        release = Event()
+
+        async def hold():
+            async with pool.slot():
+                await release.wait()
+
+        async def work(name: str, priority: Priority):
+            async with pool.slot(priority):
+                order.append(name)
+
+        blocker = create_task(hold())
+        await sleep(0)
+        old = create_task(work("background", Priority.BACKGROUND))
+        await sleep(0)
+        # 等待两个 AGING 周期后，后台任务的优先级提升至最高
+        now[0] = Scheduler.AGING * 2
+        new = create_task(work("normal", Priority.NORMAL))
+        await sleep(0)
+        release.set()
+        await gather(blocker, old, new)
+        return order
+
+    assert run(main()) == ["background", "normal"]
+
+
+def test_cancel_waiting():
+    async def main():
+        pool = Scheduler(1)
+        release = Event()
+
+        async def hold():
+            async with pool.slot():
+                await release.wait()
+
+        async def work():
+            async with pool.slot():
+                pass
+
+        blocker = create_task(hold())
+        await sleep(0)
+        waiting = create_task(work())
+        await sleep(0)
+        assert pool.status()["waiting"]["NORMAL"] == 1
+        waiting.cancel()
+        await gather(waiting, return_exceptions=True)
+        assert pool.waiting == []
+        release.set()
+        await blocker
+        return pool.active
+
+    assert run(main()) == 0
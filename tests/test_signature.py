@@ -0,0 +1,23 @@
+from source.module import FILE_SIGNATURES, FILE_SIGNATURES_LENGTH, match_signature
+
+
+def test_match_signature():
+    assert match_signature(b"\xff\xd8\xff\xe0" + b"\x00" * 20) == "jpeg"
+    assert match_signature(b"\x89PNG\r\n\x1a\n" + b"\x00" * 20) == "png"
+    assert match_signature(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+    assert match_signature(b"\x00\x00\x00\x1cftypheic" + b"\x00" * 8) == "heic"
+    assert match_signature(b"\x00\x00\x00\x18ftypisom" + b"\x00" * 8) == "mp4"
+    assert match_signature(b"\x00\x00\x00\x14ftypqt  " + b"\x00" * 8) == "mov"
+
+
+def test_match_signature_unknown():
+    assert match_signature(b"") == ""
+    assert match_signature(b"\x00\x00") == ""
+    assert match_signature(b"<html><body>") == ""
+    assert match_signature(b'{"code": -1}') == ""
+
+
+def test_match_every_signature():
+    for offset, signature, suffix in FILE_SIGNATURES:
+        start = b"\x01" * offset + signature
+        assert match_signature(start.ljust(FILE_SIGNATURES_LENGTH, b"\x01")) == suffix
@@ -0,0 +1,89 @@
+from asyncio import run
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from source.expansion import BufferPool, ChunkWriter, FileSystem, MemoryBudget
+
+
+def test_buffer_pool():
+    pool = BufferPool()
+    assert pool.bucket(1) == BufferPool.MIN_SIZE
+    assert pool.bucket(100 * 1024) == 128 * 1024
+    buffer = pool.acquire(100 * 1024)
+    assert len(buffer) == 128 * 1024
+    pool.release(buffer)
+    assert pool.acquire(70 * 1024) is buffer
+    assert pool.status()["reused"] == 1
+
+
+def test_writer_reuse():
+    data = bytes(range(256)) * 40
+
+    async def main(root: Path):
+        fs = FileSystem()
+        budget = MemoryBudget()
+        for name in ("a", "b"):
+            async with fs.open(root.joinpath(name), 0, 4096, len(data), budget) as f:
+                for i in range(0, len(data), 1000):
+                    await f.write(data[i : i + 1000])
+        # 断点续传时缓冲区不超过剩余数据量
+        async with fs.open(root.joinpath("a"), len(data) - 10, 4096, len(data)) as f:
+            size = f.size
+            await f.write(data[-10:])
+        fs.close()
+        return size, fs.pool.status(), budget.usage
+
+    with TemporaryDirectory() as root:
+        root = Path(root)
+        size, status, usage = run(main(root))
+        assert root.joinpath("a").read_bytes() == data
+        assert root.joinpath("b").read_bytes() == data
+    assert size == 10
+    assert status["allocated"] == 2
+    assert status["reused"] >= 2
+    assert usage == 0
+
+
+def test_writer_small_file():
+    async def main(root: Path):
+        fs = FileSystem()
+        async with fs.open(root.joinpath("small"), 0, 1024 * 1024, 100) as f:
+            size = f.size
+            await f.write(b"x" * 100)
+        fs.close()
+        return size
+
+    with TemporaryDirectory() as root:
+        root = Path(root)
+        assert run(main(root)) == 100
+        assert root.joinpath("small").read_bytes() == b"x" * 100
+
+
+def test_buffer_pool_limit():
+    pool = BufferPool(limit=BufferPool.MIN_SIZE * 3)
+    buffers = [pool.acquire(BufferPool.MIN_SIZE) for _ in range(4)]
+    buffers.append(pool.acquire(BufferPool.MIN_SIZE * 2))
+    for buffer in buffers:
+        pool.release(buffer)
+    # 空闲缓冲区总大小不超过上限
+    assert pool.status()["idle"] == BufferPool.MIN_SIZE * 3
+    pool.acquire(BufferPool.MIN_SIZE)
+    assert pool.status()["idle"] == BufferPool.MIN_SIZE * 2
+
+
+def test_writer_budget():
+    async def main(root: Path):
+        fs = FileSystem()
+        budget = MemoryBudget()
+        size = 100 * 1024
+        async with fs.open(root.joinpath("a"), 0, size, size * 4, budget) as f:
+            for _ in range(4):
+                await f.write(b"x" * size)
+        fs.close()
+        return budget.peak, budget.usage
+
+    with TemporaryDirectory() as root:
+        peak, usage = run(main(Path(root)))
+    # 按缓冲区池分配的实际大小计入内存预算
+    assert peak == BufferPool.bucket(100 * 1024) * ChunkWriter.MAX_BUFFERS
+    assert usage == 0